@@ -0,0 +1,45 @@
+"""
+Trigram indexes for the partial name searches used by the MCP car search.
+
+Django compiles ``name__icontains`` on PostgreSQL to ``UPPER("name"::text) LIKE UPPER(%s)``, so the
+GIN indexes are built on that same expression with ``gin_trgm_ops``; ``LIKE '%term%'`` can then use
+an index probe instead of a sequential scan. The indexes are part of the model state on every backend,
+but only created on PostgreSQL (other backends have no pg_trgm).
+"""
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+class AddPostgresIndex(migrations.AddIndex):
+    """AddIndex that updates the model state everywhere but only touches the database on PostgreSQL."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        """Create the index on PostgreSQL only."""
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        """Drop the index on PostgreSQL only."""
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cars", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        *(
+            AddPostgresIndex(
+                model_name=model_name,
+                index=GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name=f"cars_{model_name}_name_upper_trgm"),
+            )
+            for model_name in ("brand", "carname", "carmodel", "color", "engine")
+        ),
+    ]
@@ -6,8 +6,10 @@ and updated_at. Models include Brand and Car with specific fields
 for automotive management.
 """
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MaxValueValidator, MinValueValidator, RegexValidator
 from django.db import models
+from django.db.models.functions import Upper
 
 from drf_base_apps.models import AbstractDescription
 from drf_base_apps.utils import _
@@ -16,6 +18,16 @@ from .constants import FuelTypeChoices, TransmissionChoices
 from .utils import normalize_name
 
 
+def name_trigram_index(name: str) -> GinIndex:
+    """
+    Build the pg_trgm GIN index used by the partial name searches.
+
+    ``name__icontains`` compiles on PostgreSQL to ``UPPER("name"::text) LIKE UPPER(%s)``, so the index
+    covers that same expression (migration 0002 creates it only on PostgreSQL).
+    """
+    return GinIndex(OpClass(Upper("name"), name="gin_trgm_ops"), name=name)
+
+
 class AbstractNameModel(AbstractDescription):
     """
     Abstract model that provides a normalized name field.
@@ -56,6 +68,7 @@ class Brand(AbstractNameModel):
 
         verbose_name = _("Brand")
         verbose_name_plural = _("Brands")
+        indexes = (name_trigram_index("cars_brand_name_upper_trgm"),)
 
 
 class Color(AbstractNameModel):
@@ -74,6 +87,7 @@ class Color(AbstractNameModel):
 
         verbose_name = _("Color")
         verbose_name_plural = _("Colors")
+        indexes = (name_trigram_index("cars_color_name_upper_trgm"),)
 
 
 class Engine(AbstractNameModel):
@@ -97,6 +111,7 @@ class Engine(AbstractNameModel):
 
         verbose_name = _("Engine")
         verbose_name_plural = _("Engines")
+        indexes = (name_trigram_index("cars_engine_name_upper_trgm"),)
 
     def save(self, *args, **kwargs):
         """Save the engine with normalized displacement."""
@@ -128,6 +143,7 @@ class CarName(AbstractDescription):
         verbose_name_plural = _("Car Names")
         ordering = ("brand__name", "name")
         unique_together = ("name", "brand")
+        indexes = (name_trigram_index("cars_carname_name_upper_trgm"),)
 
     def save(self, *args, **kwargs):
         """Save the car name with normalized name."""
@@ -153,6 +169,7 @@ class CarModel(AbstractNameModel):
 
         verbose_name = _("Car Model")
         verbose_name_plural = _("Car Models")
+        indexes = (name_trigram_index("cars_carmodel_name_upper_trgm"),)
 
 
 class Car(AbstractDescription):
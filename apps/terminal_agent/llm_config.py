@@ -8,9 +8,22 @@ e suas configurações específicas.
 import os
 from typing import Any, Optional
 
+
+def _env_float(name: str, default: float) -> float:
+    """Lê um número positivo do ambiente; valores ausentes ou inválidos usam o padrão."""
+    try:
+        value = float(os.getenv(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
 # Configurações padrão
 DEFAULT_LLM_PROVIDER = os.getenv("LLM_PROVIDER", "auto")  # auto, simple, ollama
 
+# Timeout (segundos) da sondagem de disponibilidade do Ollama; aumente para servidores locais lentos
+OLLAMA_AVAILABILITY_TIMEOUT = _env_float("OLLAMA_AVAILABILITY_TIMEOUT", 5.0)
+
 # Configurações específicas por provedor
 LLM_CONFIGS = {
     "simple": {"class": "SimpleLLM", "enabled": True, "description": "LLM simples para desenvolvimento e testes"},
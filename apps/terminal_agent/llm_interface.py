@@ -5,205 +5,486 @@ Este módulo define a interface padrão que todos os provedores de LLM devem imp
 permitindo fácil troca entre diferentes modelos e serviços.
 """
 
+import hashlib
 import json
 import logging
 import re
+import textwrap
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
 from typing import Any, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, usa o json da biblioteca padrão
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Bloco de código JSON (```json ... ```) nas respostas da LLM
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+# Decoder compartilhado para raw_decode (sem estado, pode ser reutilizado entre chamadas)
+_DECODER = json.JSONDecoder()
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Decodifica JSON, usando orjson quando disponível."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _clean_prompt(text: str) -> str:
+    """Remove a indentação do literal e as bordas em branco, uma única vez no carregamento do módulo."""
+    return textwrap.dedent(text).strip()
+
+
+def _compile_keywords(keywords: tuple[str, ...]) -> re.Pattern:
+    """Compila uma lista de palavras-chave em uma única alternação regex (busca por substring)."""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+# Palavras-chave que indicam refinamento da busca anterior
+_REFINEMENT_RE = _compile_keywords(
+    (
+        "dessa lista",
+        "desses",
+        "desta lista",
+        "destes",
+        "me mostre os de",
+        "mostre apenas",
+        "filtre por",
+        "só os",
+        "apenas os",
+        "quero ver os",
+        "refinar",
+        "filtrar",
+        "especificar",
+    )
+)
+
+# Características específicas que podem ser usadas como filtros no refinamento
+_CHARACTERISTICS_RE = _compile_keywords(
+    ("cor", "preço", "ano", "combustível", "transmissão", "portas", "quilometragem", "marca", "modelo")
+)
+
+# Palavras-chave que indicam pedido de limpeza dos filtros
+_CLEAR_FILTERS_RE = _compile_keywords(
+    (
+        "limpe os filtros",
+        "limpar filtros",
+        "limpe filtros",
+        "nova busca",
+        "nova pesquisa",
+        "começar do zero",
+        "resetar",
+        "limpar tudo",
+        "começar novo",
+        "apagar filtros",
+        "remover filtros",
+        "zerar",
+    )
+)
+
+# Dict vazio compartilhado para acessos aninhados (somente leitura)
+_EMPTY: dict[str, Any] = {}
+
+# Chaves de preferências aceitas na extração
+_VALID_PREF_KEYS = frozenset(
+    {
+        "nome",
+        "marca",
+        "modelo",
+        "faixa_preco",
+        "ano",
+        "combustivel",
+        "transmissao",
+        "cor",
+        "portas",
+        "quilometragem",
+        "uso",
+    }
+)
+
+# Mapeamento de sinônimos de chaves dos filtros gerados pela LLM
+_KEY_SYNONYMS = {
+    "marca": "brand_name",
+    "brand": "brand_name",
+    "nome_marca": "brand_name",
+    "modelo": "car_name",
+    "nome_carro": "car_name",
+    "cor": "color_name",
+    "motor": "engine_name",
+    "combustivel": "fuel_type",
+    "transmissao": "transmission",
+    "preco_min": "price_min",
+    "preco_max": "price_max",
+    "ano_min": "year_manufacture_min",
+    "ano_max": "year_manufacture_max",
+    "quilometragem_min": "mileage_min",
+    "quilometragem_max": "mileage_max",
+    "portas": "doors",  # pode virar doors_min/max
+}
+
+# Preferências copiadas diretamente para filtros MCP (preferência -> filtro)
+_DIRECT_PREF_FILTERS = (
+    ("nome", "car_name"),
+    ("marca", "brand_name"),
+    ("combustivel", "fuel_type"),
+    ("transmissao", "transmission"),
+    ("cor", "color_name"),
+)
+
+# Faixas de preço categóricas -> (price_min, price_max)
+_PRICE_RANGES = {
+    "economico": (None, 50000),
+    "medio": (30000, 100000),
+    "luxo": (100000, None),
+}
+
+# Categorias de ano -> (ano mínimo, ano máximo)
+_YEAR_CATEGORIES = {
+    "recente": (2020, None),
+    "antigo": (None, 2015),
+}
+
+# Perguntas de fallback por informação faltante, em ordem de prioridade
+_SIMPLE_QUESTIONS = {
+    "marca": "🚗 Qual marca de carro você prefere?",
+    "faixa_preco": "💰 Qual sua faixa de preço?",
+    "ano": "📅 Que ano de carro você procura?",
+    "combustivel": "⛽ Qual tipo de combustível prefere?",
+    "transmissao": "🔧 Prefere câmbio manual ou automático?",
+    "cor": "🎨 Tem alguma cor preferida?",
+    "portas": "🚪 Quantas portas prefere?",
+    "quilometragem": "🛣️ Qual a quilometragem máxima que aceita?",
+}
+
+# Operadores de igualdade que a LLM pode usar no lugar do valor plano
+_EQ_OPERATORS = ("$eq", "eq", "=", "value")
+
+# Campos que aceitam range (viram *_min/*_max)
+_RANGE_KEYS = frozenset({"price", "year_manufacture", "mileage", "doors"})
+
+
+@dataclass(slots=True)
+class SimplifiedCar:
+    """Representação enxuta de um carro usada na formatação de resultados."""
+
+    marca: Any = "N/A"
+    modelo: Any = "N/A"
+    ano: Any = "N/A"
+    cor: Any = "N/A"
+    preco: Any = 0
+    quilometragem: Any = 0
+    combustivel: Any = "N/A"
+    transmissao: Any = "N/A"
+
+    @classmethod
+    def from_car(cls, car: dict[str, Any]) -> "SimplifiedCar":
+        """
+        Cria a versão simplificada a partir de um carro serializado.
+
+        Args:
+            car: Carro retornado pela busca MCP
+
+        Returns:
+            Carro simplificado
+
+        """
+        car_name = car.get("car_name") or _EMPTY
+        return cls(
+            marca=(car_name.get("brand") or _EMPTY).get("name", "N/A"),
+            modelo=car_name.get("name", "N/A"),
+            ano=car.get("year_manufacture", "N/A"),
+            cor=(car.get("color") or _EMPTY).get("name", "N/A"),
+            preco=car.get("price", 0),
+            quilometragem=car.get("mileage", 0),
+            combustivel=car.get("fuel_type", "N/A"),
+            transmissao=car.get("transmission", "N/A"),
+        )
+
 
 class LLMPrompts:
     """Constantes com prompts padronizados para todos os LLMs."""
 
     # Prompt para extração de preferências
-    EXTRACT_PREFERENCES_SYSTEM = """
-    Você é um assistente especializado em extrair preferências de carros de conversas naturais.
-
-    Extraia as seguintes informações do input do usuário:
-    - nome: nome completo do carro (ex: Audi A4, BMW X5, Toyota Corolla)
-    - marca: marca do carro (ex: Audi, BMW, Toyota)
-    - modelo: modelo específico (ex: A4, X5, Corolla)
-    - faixa_preco: faixa de preço (economico, medio, luxo)
-    - ano: preferência de ano. Se o usuário fornecer um ano específico (ex: 2016), retorne um NÚMERO inteiro (ex: 2016). A saída deve ser sempre um NÚMERO inteiro, qunado solicitado um ano.
-    - combustivel: tipo de combustível (gasolina, etanol, flex, diesel, eletrico, hibrido)
-    - transmissao: tipo de transmissão (manual, automatico, cvt, semi_automatico, dual_clutch)
-    - cor: cor preferida
-    - portas: número de portas (2, 4, 5)
-    - quilometragem: quilometragem máxima aceita
-    - uso: tipo de uso (cidade, estrada, trabalho, lazer)
-
-    IMPORTANTE: Se o usuário está refinando uma busca anterior (quando há contexto de resultados anteriores):
-    - Mantenha as preferências da busca anterior que não foram alteradas
-    - Adicione/modifique apenas as novas preferências mencionadas
-    - Se o usuário mencionar uma característica específica (ex: "cor Perolado"), use isso para filtrar os resultados anteriores
-
-    Responda APENAS com um JSON válido contendo as preferências extraídas.
-    Use null para informações não mencionadas.
-    """
+    EXTRACT_PREFERENCES_SYSTEM = _clean_prompt(
+        """
+        Você é um assistente especializado em extrair preferências de carros de conversas naturais.
+
+        Extraia as seguintes informações do input do usuário:
+        - nome: nome completo do carro (ex: Audi A4, BMW X5, Toyota Corolla)
+        - marca: marca do carro (ex: Audi, BMW, Toyota)
+        - modelo: modelo específico (ex: A4, X5, Corolla)
+        - faixa_preco: faixa de preço (economico, medio, luxo)
+        - ano: preferência de ano. Se o usuário fornecer um ano específico (ex: 2016), retorne um NÚMERO inteiro (ex: 2016). A saída deve ser sempre um NÚMERO inteiro, qunado solicitado um ano.
+        - combustivel: tipo de combustível (gasolina, etanol, flex, diesel, eletrico, hibrido)
+        - transmissao: tipo de transmissão (manual, automatico, cvt, semi_automatico, dual_clutch)
+        - cor: cor preferida
+        - portas: número de portas (2, 4, 5)
+        - quilometragem: quilometragem máxima aceita
+        - uso: tipo de uso (cidade, estrada, trabalho, lazer)
+
+        IMPORTANTE: Se o usuário está refinando uma busca anterior (quando há contexto de resultados anteriores):
+        - Mantenha as preferências da busca anterior que não foram alteradas
+        - Adicione/modifique apenas as novas preferências mencionadas
+        - Se o usuário mencionar uma característica específica (ex: "cor Perolado"), use isso para filtrar os resultados anteriores
+
+        Responda APENAS com um JSON válido contendo as preferências extraídas.
+        Use null para informações não mencionadas.
+        """
+    )
 
     # Prompt para geração de filtros
-    GENERATE_FILTERS_SYSTEM = """
-    Você é um especialista em converter preferências de carros em filtros de busca para Django ORM.
-
-    REGRAS IMPORTANTES DE SAÍDA (obrigatórias):
-    - Responda APENAS com um JSON VÁLIDO (sem explicações).
-    - Use campos FLAT (planos), SEM operadores como $eq, $gte, $lte, $in.
-    - Mapeie ranges para chaves com sufixo _min/_max (ex.: price_min, price_max).
-    - Use exatamente estas chaves quando aplicável:
-      - brand_name (marca do carro em texto)
-      - car_name (nome completo do carro em texto - ex: "Audi A4", "BMW X5")
-      - color_name, engine_name, car_model_name
-      - fuel_type (gasoline, ethanol, flex, diesel, electric, hybrid)
-      - transmission (manual, automatic, cvt, semi_automatic, dual_clutch)
-      - price_min, price_max
-      - year_manufacture_min, year_manufacture_max (se o usuário disser um ano específico ex.: 2016, use os dois com o MESMO valor 2016)
-      - year_model_min, year_model_max (pode repetir o mesmo valor do ano específico quando aplicável)
-      - mileage_min, mileage_max
-      - doors_min, doors_max
-    - Não inclua campos com valor null/None.
-    - Se houver preferência "nome" (nome completo do carro), use car_name.
-
-    Exemplos de saída CORRETA:
-    {"brand_name": "Audi"}
-    {"car_name": "Audi A4"}
-    {"brand_name": "Audi", "price_max": 120000, "year_manufacture_min": 2018}
-    """
+    GENERATE_FILTERS_SYSTEM = _clean_prompt(
+        """
+        Você é um especialista em converter preferências de carros em filtros de busca para Django ORM.
+
+        REGRAS IMPORTANTES DE SAÍDA (obrigatórias):
+        - Responda APENAS com um JSON VÁLIDO (sem explicações).
+        - Use campos FLAT (planos), SEM operadores como $eq, $gte, $lte, $in.
+        - Mapeie ranges para chaves com sufixo _min/_max (ex.: price_min, price_max).
+        - Use exatamente estas chaves quando aplicável:
+          - brand_name (marca do carro em texto)
+          - car_name (nome completo do carro em texto - ex: "Audi A4", "BMW X5")
+          - color_name, engine_name, car_model_name
+          - fuel_type (gasoline, ethanol, flex, diesel, electric, hybrid)
+          - transmission (manual, automatic, cvt, semi_automatic, dual_clutch)
+          - price_min, price_max
+          - year_manufacture_min, year_manufacture_max (se o usuário disser um ano específico ex.: 2016, use os dois com o MESMO valor 2016)
+          - year_model_min, year_model_max (pode repetir o mesmo valor do ano específico quando aplicável)
+          - mileage_min, mileage_max
+          - doors_min, doors_max
+        - Não inclua campos com valor null/None.
+        - Se houver preferência "nome" (nome completo do carro), use car_name.
+
+        Exemplos de saída CORRETA:
+        {"brand_name": "Audi"}
+        {"car_name": "Audi A4"}
+        {"brand_name": "Audi", "price_max": 120000, "year_manufacture_min": 2018}
+        """
+    )
 
     # Prompt para formatação de resultados
-    FORMAT_RESULTS_SYSTEM = """
-    Você é um assistente virtual especializado em apresentar resultados de busca de carros.
-
-    INSTRUÇÕES OBRIGATÓRIAS:
-    - Apresente TODOS os carros encontrados em formato de lista numerada
-    - Para cada carro, inclua: marca, modelo, ano, preço, quilometragem, cor, combustível, transmissão
-    - Use emojis apropriados (🚗, 💰, ⛽, etc.)
-    - Seja detalhado e informativo
-    - Formate o preço em reais (R$)
-    - Sugira próximos passos ou perguntas
-    - Mínimo de 200 caracteres por resposta
-    - Use formatação clara com quebras de linha
-    """
+    FORMAT_RESULTS_SYSTEM = _clean_prompt(
+        """
+        Você é um assistente virtual especializado em apresentar resultados de busca de carros.
+
+        INSTRUÇÕES OBRIGATÓRIAS:
+        - Apresente TODOS os carros encontrados em formato de lista numerada
+        - Para cada carro, inclua: marca, modelo, ano, preço, quilometragem, cor, combustível, transmissão
+        - Use emojis apropriados (🚗, 💰, ⛽, etc.)
+        - Seja detalhado e informativo
+        - Formate o preço em reais (R$)
+        - Sugira próximos passos ou perguntas
+        - Mínimo de 200 caracteres por resposta
+        - Use formatação clara com quebras de linha
+        """
+    )
 
     # Prompt para geração de perguntas
-    GENERATE_QUESTION_SYSTEM = """
-    Você é um assistente de vendas de carros experiente.
+    GENERATE_QUESTION_SYSTEM = _clean_prompt(
+        """
+        Você é um assistente de vendas de carros experiente.
 
-    Gere uma pergunta natural e amigável para esclarecer as preferências do cliente.
-    Seja conversacional e útil, não robótico.
-    Foque em uma informação por vez para não sobrecarregar.
-    """
+        Gere uma pergunta natural e amigável para esclarecer as preferências do cliente.
+        Seja conversacional e útil, não robótico.
+        Foque em uma informação por vez para não sobrecarregar.
+        """
+    )
 
     # Templates de perguntas por tipo de informação
-    QUESTION_TEMPLATES = {
-        "marca": "Qual marca de carro você prefere? (ex: Audi, BMW, Toyota, Honda...)",
-        "faixa_preco": "Qual sua faixa de preço preferida? (econômico, médio, luxo)",
-        "ano": "Prefere carros mais novos ou usados?",
-        "combustivel": "Qual tipo de combustível prefere? (gasolina, etanol, flex, híbrido...)",
-        "transmissao": "Prefere câmbio manual ou automático?",
-        "cor": "Tem alguma cor preferida?",
-        "portas": "Quantas portas prefere? (2, 4 ou 5 portas)",
-        "quilometragem": "Qual a quilometragem máxima que aceita?",
-        "uso": "Para que tipo de uso? (cidade, estrada, trabalho, lazer)",
-    }
+    QUESTION_TEMPLATES = MappingProxyType(
+        {
+            "marca": "Qual marca de carro você prefere? (ex: Audi, BMW, Toyota, Honda...)",
+            "faixa_preco": "Qual sua faixa de preço preferida? (econômico, médio, luxo)",
+            "ano": "Prefere carros mais novos ou usados?",
+            "combustivel": "Qual tipo de combustível prefere? (gasolina, etanol, flex, híbrido...)",
+            "transmissao": "Prefere câmbio manual ou automático?",
+            "cor": "Tem alguma cor preferida?",
+            "portas": "Quantas portas prefere? (2, 4 ou 5 portas)",
+            "quilometragem": "Qual a quilometragem máxima que aceita?",
+            "uso": "Para que tipo de uso? (cidade, estrada, trabalho, lazer)",
+        }
+    )
 
     # Configurações de geração
-    GENERATION_CONFIGS = {
-        "extract_preferences": {"temperature": 0.1, "max_tokens": 200},
-        "generate_filters": {"temperature": 0.1, "max_tokens": 200},
-        "format_results": {"temperature": 0.5, "max_tokens": 1500},  # Aumentado para respostas detalhadas
-        "generate_question": {"temperature": 0.7, "max_tokens": 150},
-    }
+    GENERATION_CONFIGS = MappingProxyType(
+        {
+            "extract_preferences": MappingProxyType({"temperature": 0.1, "max_tokens": 200}),
+            "generate_filters": MappingProxyType({"temperature": 0.1, "max_tokens": 200}),
+            # Aumentado para respostas detalhadas
+            "format_results": MappingProxyType({"temperature": 0.5, "max_tokens": 1500}),
+            "generate_question": MappingProxyType({"temperature": 0.7, "max_tokens": 150}),
+        }
+    )
+
+    # Configuração usada para tarefas sem entrada em GENERATION_CONFIGS
+    DEFAULT_GENERATION_CONFIG = MappingProxyType({"temperature": 0.7, "max_tokens": 200})
+
+    # Entradas menores que isso não carregam informação suficiente para a LLM
+    MIN_INPUT_CHARS = 2
+
+    # Limite de tokens quando falta apenas uma informação (pergunta curta)
+    SINGLE_QUESTION_MAX_TOKENS = 64
 
 
 class LLMInterface(ABC):
     """Interface abstrata para provedores de LLM."""
 
+    # Número máximo de respostas mantidas no cache LRU (por instância)
+    response_cache_size = 256
+
     # Métodos utilitários compartilhados
-    def _extract_json_from_response(self, response: str) -> Optional[str]:
-        """Extrai JSON de uma resposta de texto de forma robusta."""
-        # Procurar por blocos de código JSON
-        json_pattern = r"```(?:json)?\s*(\{.*?\})\s*```"
-        match = re.search(json_pattern, response, re.DOTALL)
-        if match:
-            return match.group(1)
+    def _get_response_cache(self) -> OrderedDict:
+        """Retorna o cache LRU de respostas, criando-o sob demanda."""
+        cache = getattr(self, "_response_cache", None)
+        if cache is None:
+            cache = self._response_cache = OrderedDict()
+        return cache
+
+    @staticmethod
+    def _response_cache_key(prompt: str, system_prompt: Optional[str], temperature: float, max_tokens: int) -> bytes:
+        """Gera chave compacta para o cache a partir do prompt e dos parâmetros de geração."""
+        raw = f"{system_prompt}\0{prompt}\0{temperature}\0{max_tokens}"
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+    def _generate_json_response(
+        self, prompt: str, system_prompt: Optional[str], temperature: float, max_tokens: int
+    ) -> Optional[dict[str, Any]]:
+        """
+        Gera resposta e extrai o JSON, reaproveitando respostas idênticas já obtidas.
+
+        Apenas respostas com JSON válido entram no cache, para que erros do provedor
+        não fiquem memorizados.
+
+        Args:
+            prompt: Prompt para o modelo
+            system_prompt: Prompt do sistema
+            temperature: Temperatura para geração
+            max_tokens: Número máximo de tokens
+
+        Returns:
+            Dicionário extraído da resposta ou None
+
+        """
+        cache = self._get_response_cache()
+        key = self._response_cache_key(prompt, system_prompt, temperature, max_tokens)
+
+        response = cache.get(key)
+        if response is not None:
+            cache.move_to_end(key)
+            logger.debug("Resposta da LLM reaproveitada do cache")
+            return self._extract_json_from_response(response)
+
+        response = self.generate_response(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        logger.debug("Resposta da LLM: %s", response)
 
-        # Procurar por JSON simples
-        json_start = response.find("{")
-        json_end = response.rfind("}") + 1
+        data = self._extract_json_from_response(response)
+        if data is not None:
+            cache[key] = response
+            if len(cache) > self.response_cache_size:
+                cache.popitem(last=False)
 
-        if json_start != -1 and json_end > json_start:
-            return response[json_start:json_end]
+        return data
 
-        return None
+    def _extract_json_from_response(self, response: str) -> Optional[dict[str, Any]]:
+        """Extrai e decodifica o objeto JSON de uma resposta de texto de forma robusta."""
+        text = response.strip()
 
-    def _simplify_cars_for_formatting(self, cars: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        # Caminho rápido: resposta é exatamente um objeto JSON, decodificado de uma vez
+        if text.startswith("{") and text.endswith("}"):
+            try:
+                obj = json_loads(text)
+                return obj if isinstance(obj, dict) else None
+            except json.JSONDecodeError:
+                pass  # Texto após o objeto ou JSON parcial: tentar decodificação incremental
+
+        # Resposta com texto em volta: procurar por blocos de código JSON
+        if not text.startswith("{"):
+            # Procurar por blocos de código JSON
+            match = _JSON_BLOCK_RE.search(text)
+            if match:
+                text = match.group(1)
+
+        json_start = text.find("{")
+        if json_start == -1:
+            return None
+
+        # Decodificação incremental: para no fim do objeto, ignorando texto posterior
+        try:
+            obj, _ = _DECODER.raw_decode(text, json_start)
+        except json.JSONDecodeError as e:
+            logger.error("Erro ao decodificar JSON: %s", e)
+            return None
+
+        return obj if isinstance(obj, dict) else None
+
+    def _simplify_cars_for_formatting(self, cars: list[dict[str, Any]]) -> list[SimplifiedCar]:
         """Simplifica estrutura dos carros para formatação."""
         simplified_cars = []
+        append = simplified_cars.append
         for car in cars:
             try:
-                simplified_car = {
-                    "marca": car.get("car_name", {}).get("brand", {}).get("name", "N/A"),
-                    "modelo": car.get("car_name", {}).get("name", "N/A"),
-                    "ano": car.get("year_manufacture", "N/A"),
-                    "cor": car.get("color", {}).get("name", "N/A"),
-                    "preco": car.get("price", 0),
-                    "quilometragem": car.get("mileage", 0),
-                    "combustivel": car.get("fuel_type", "N/A"),
-                    "transmissao": car.get("transmission", "N/A"),
-                }
-                simplified_cars.append(simplified_car)
+                append(SimplifiedCar.from_car(car))
             except Exception as e:
-                logger.warning(f"Erro ao simplificar carro: {e}")
+                # Um carro malformado é descartado sem derrubar os demais
+                logger.warning("Erro ao simplificar carro: %s", e)
                 continue
 
         return simplified_cars
 
-    def _format_cars_simple(self, cars: list[dict[str, Any]]) -> str:
+    def _format_cars_simple(self, cars: list[SimplifiedCar | dict[str, Any]]) -> str:
         """Formatação simples como fallback."""
         if not cars:
             return "😔 Não encontrei carros que atendam aos seus critérios. Que tal ajustarmos a busca?"
 
-        result_text = f"🚗 Encontrei {len(cars)} carro(s) que atendem aos seus critérios:\n\n"
+        parts = [f"🚗 Encontrei {len(cars)} carro(s) que atendem aos seus critérios:\n\n"]
+        append = parts.append
 
         for i, car in enumerate(cars, 1):
             try:
-                # Usar dados simplificados se disponíveis
-                if "marca" in car:
-                    brand_name = car.get("marca", "N/A")
-                    car_name = car.get("modelo", "N/A")
-                    year = car.get("ano", "N/A")
-                    price = car.get("preco", 0)
-                    color = car.get("cor", "N/A")
-                    fuel = car.get("combustivel", "N/A")
-                    transmission = car.get("transmissao", "N/A")
-                    mileage = car.get("quilometragem", 0)
-                else:
-                    # Usar dados originais
-                    brand_name = car.get("car_name", {}).get("brand", {}).get("name", "N/A")
-                    car_name = car.get("car_name", {}).get("name", "N/A")
-                    year = car.get("year_manufacture", "N/A")
-                    price = car.get("price", 0)
-                    color = car.get("color", {}).get("name", "N/A")
-                    fuel = car.get("fuel_type", "N/A")
-                    transmission = car.get("transmission", "N/A")
-                    mileage = car.get("mileage", 0)
-
-                result_text += f"{i}. **{brand_name} {car_name} ({year})**\n"
-                result_text += f"   💰 Preço: R$ {price:,.2f}\n"
-                result_text += f"   🎨 Cor: {color}\n"
-                result_text += f"   ⛽ Combustível: {fuel}\n"
-                result_text += f"   🔧 Transmissão: {transmission}\n"
+                # Usar dados originais convertidos para a forma simplificada
+                if not isinstance(car, SimplifiedCar):
+                    car = SimplifiedCar.from_car(car)
+                brand_name = car.marca
+                car_name = car.modelo
+                year = car.ano
+                price = car.preco
+                color = car.cor
+                fuel = car.combustivel
+                transmission = car.transmissao
+                mileage = car.quilometragem
+
+                # O bloco do carro é montado por inteiro antes de entrar na lista: uma falha não deixa texto parcial
+                car_text = (
+                    f"{i}. **{brand_name} {car_name} ({year})**\n"
+                    f"   💰 Preço: R$ {price:,.2f}\n"
+                    f"   🎨 Cor: {color}\n"
+                    f"   ⛽ Combustível: {fuel}\n"
+                    f"   🔧 Transmissão: {transmission}\n"
+                )
                 if mileage > 0:
-                    result_text += f"   🛣️ Quilometragem: {mileage:,} km\n"
-                result_text += "\n"
+                    car_text += f"   🛣️ Quilometragem: {mileage:,} km\n"
             except Exception as e:
-                logger.warning(f"Erro ao formatar carro {i}: {e}")
+                logger.warning("Erro ao formatar carro %s: %s", i, e)
                 continue
 
-        result_text += "💡 Gostaria de saber mais detalhes sobre algum carro específico?"
-        return result_text
+            append(car_text)
+            append("\n")
+
+        append("💡 Gostaria de saber mais detalhes sobre algum carro específico?")
+        return "".join(parts)
 
     def _format_cars_fast(self, cars: list[dict[str, Any]], user_preferences: dict[str, Any]) -> str:
         """
@@ -231,7 +512,7 @@ class LLMInterface(ABC):
                 car_info = self._format_single_car(car, i)
                 result_text += car_info + "\n"
             except Exception as e:
-                logger.warning(f"Erro ao formatar carro {i}: {e}")
+                logger.warning("Erro ao formatar carro %s: %s", i, e)
                 continue
 
         # Rodapé com sugestões
@@ -297,7 +578,7 @@ class LLMInterface(ABC):
             return car_text
 
         except Exception as e:
-            logger.warning(f"Erro ao formatar carro {index}: {e}")
+            logger.warning("Erro ao formatar carro %s: %s", index, e)
             return f"{index}. **Erro ao carregar informações do carro**\n"
 
     def _generate_suggestions_footer(self, preferences: dict[str, Any]) -> str:
@@ -320,58 +601,26 @@ class LLMInterface(ABC):
 
     def _validate_preferences(self, preferences: dict[str, Any]) -> dict[str, Any]:
         """Valida e limpa preferências extraídas."""
-        valid_preferences = {}
-
-        # Mapear campos válidos
-        field_mapping = {
-            "nome": "nome",
-            "marca": "marca",
-            "modelo": "modelo",
-            "faixa_preco": "faixa_preco",
-            "ano": "ano",
-            "combustivel": "combustivel",
-            "transmissao": "transmissao",
-            "cor": "cor",
-            "portas": "portas",
-            "quilometragem": "quilometragem",
-            "uso": "uso",
-        }
-
-        for key, value in preferences.items():
-            if key in field_mapping and value is not None:
-                valid_preferences[field_mapping[key]] = value
-
-        return valid_preferences
+        return {key: value for key, value in preferences.items() if key in _VALID_PREF_KEYS and value is not None}
 
     def _convert_preferences_to_filters(self, preferences: dict[str, Any]) -> dict[str, Any]:
         """Modificar preferências em filtros MCP."""
-        filters = {
-            "car_name": preferences.get("nome"),
-            "brand_name": preferences.get("marca"),
-            "price_min": None,
-            "price_max": None,
-            "year_manufacture_min": None,
-            "year_manufacture_max": None,
-            "year_model_min": None,
-            "year_model_max": None,
-            "fuel_type": preferences.get("combustivel"),
-            "transmission": preferences.get("transmissao"),
-            "color_name": preferences.get("cor"),
-            "doors_min": None,
-            "doors_max": None,
-            "mileage_min": None,
-            "mileage_max": None,
-        }
+        # Apenas filtros com valor são adicionados, dispensando a limpeza de None ao final
+        filters: dict[str, Any] = {}
+        for pref_key, filter_key in _DIRECT_PREF_FILTERS:
+            value = preferences.get(pref_key)
+            if value is not None:
+                filters[filter_key] = value
 
         # Aplicar faixa de preço
         faixa_preco = preferences.get("faixa_preco")
-        if faixa_preco == "economico":
-            filters["price_max"] = 50000
-        elif faixa_preco == "medio":
-            filters["price_min"] = 30000
-            filters["price_max"] = 100000
-        elif faixa_preco == "luxo":
-            filters["price_min"] = 100000
+        price_min, price_max = (
+            _PRICE_RANGES.get(faixa_preco, (None, None)) if isinstance(faixa_preco, str) else (None, None)
+        )
+        if price_min:
+            filters["price_min"] = price_min
+        if price_max:
+            filters["price_max"] = price_max
 
         # Aplicar ano: aceitar inteiro específico ou categorias
         ano = preferences.get("ano")
@@ -381,12 +630,13 @@ class LLMInterface(ABC):
             filters["year_model_min"] = ano
             filters["year_model_max"] = ano
         elif isinstance(ano, str):
-            if ano == "recente":
-                filters["year_manufacture_min"] = 2020
-                filters["year_model_min"] = 2020
-            elif ano == "antigo":
-                filters["year_manufacture_max"] = 2015
-                filters["year_model_max"] = 2015
+            year_min, year_max = _YEAR_CATEGORIES.get(ano, (None, None))
+            if year_min:
+                filters["year_manufacture_min"] = year_min
+                filters["year_model_min"] = year_min
+            if year_max:
+                filters["year_manufacture_max"] = year_max
+                filters["year_model_max"] = year_max
 
         # Aplicar quilometragem
         quilometragem = preferences.get("quilometragem")
@@ -400,8 +650,7 @@ class LLMInterface(ABC):
             filters["doors_min"] = portas_int
             filters["doors_max"] = portas_int
 
-        # Remover valores None
-        return {k: v for k, v in filters.items() if v is not None}
+        return filters
 
     def _normalize_llm_filters(self, raw_filters: dict[str, Any]) -> dict[str, Any]:
         """
@@ -417,63 +666,30 @@ class LLMInterface(ABC):
 
         normalized: dict[str, Any] = {}
 
-        # Mapeamento de sinônimos de chaves
-        key_synonyms = {
-            "marca": "brand_name",
-            "brand": "brand_name",
-            "nome_marca": "brand_name",
-            "modelo": "car_name",
-            "nome_carro": "car_name",
-            "cor": "color_name",
-            "motor": "engine_name",
-            "combustivel": "fuel_type",
-            "transmissao": "transmission",
-            "preco_min": "price_min",
-            "preco_max": "price_max",
-            "ano_min": "year_manufacture_min",
-            "ano_max": "year_manufacture_max",
-            "quilometragem_min": "mileage_min",
-            "quilometragem_max": "mileage_max",
-            "portas": "doors",  # pode virar doors_min/max abaixo
-        }
+        # Passada única: normalizar chave, tirar operadores triviais ($eq) e classificar o valor
+        for raw_key, value in raw_filters.items():
+            key = _KEY_SYNONYMS.get(raw_key, raw_key)
 
-        def strip_operator(value: Any) -> Any:
             if isinstance(value, dict):
-                # Operadores comuns
-                for op in ("$eq", "eq", "=", "value"):
+                for op in _EQ_OPERATORS:
                     if op in value:
-                        return value[op]
-                # Se vier min/max ou gte/lte, retorna o próprio dict para tratamento após
-                if any(k in value for k in ("$gte", "gte", "min", "$lte", "lte", "max")):
-                    return value
-            return value
-
-        # Primeiro, normalizar chaves e tirar operadores triviais ($eq)
-        temp: dict[str, Any] = {}
-        for k, v in raw_filters.items():
-            key = key_synonyms.get(k, k)
-            temp[key] = strip_operator(v)
-
-        # Tratar ranges e valores planos
-        for key, value in temp.items():
+                        value = value[op]
+                        break
+
             if value is None or value == "":
                 continue
 
             # Ranges: price/year/doors/mileage
             if isinstance(value, dict):
                 # Mapear possíveis chaves
-                min_val = None
-                max_val = None
-                if "$gte" in value or "gte" in value:
-                    min_val = value.get("$gte", value.get("gte"))
-                if "$lte" in value or "lte" in value:
-                    max_val = value.get("$lte", value.get("lte"))
-                if "min" in value:
-                    min_val = value.get("min") if min_val is None else min_val
-                if "max" in value:
-                    max_val = value.get("max") if max_val is None else max_val
-
-                if key in ("price", "year_manufacture", "mileage", "doors"):
+                min_val = value.get("$gte", value.get("gte"))
+                if min_val is None:
+                    min_val = value.get("min")
+                max_val = value.get("$lte", value.get("lte"))
+                if max_val is None:
+                    max_val = value.get("max")
+
+                if key in _RANGE_KEYS:
                     if min_val is not None:
                         normalized[f"{key}_min"] = min_val
                     if max_val is not None:
@@ -483,7 +699,8 @@ class LLMInterface(ABC):
                 # Se for um dict sem ser range conhecido, tentar reduzir para valor direto se houver uma única chave
                 if len(value) == 1:
                     only_v = next(iter(value.values()))
-                    normalized[key] = only_v
+                    if only_v is not None:
+                        normalized[key] = only_v
                 # Caso contrário, ignora estruturas complexas
                 continue
 
@@ -513,30 +730,16 @@ class LLMInterface(ABC):
 
             normalized[key] = value
 
-        # Limpar valores None
-        normalized = {k: v for k, v in normalized.items() if v is not None}
         return normalized
 
     def _generate_simple_question(self, missing_info: list[str]) -> str:
         """Gera pergunta simples como fallback."""
-        if "marca" in missing_info:
-            return "🚗 Qual marca de carro você prefere?"
-        elif "faixa_preco" in missing_info:
-            return "💰 Qual sua faixa de preço?"
-        elif "ano" in missing_info:
-            return "📅 Que ano de carro você procura?"
-        elif "combustivel" in missing_info:
-            return "⛽ Qual tipo de combustível prefere?"
-        elif "transmissao" in missing_info:
-            return "🔧 Prefere câmbio manual ou automático?"
-        elif "cor" in missing_info:
-            return "🎨 Tem alguma cor preferida?"
-        elif "portas" in missing_info:
-            return "🚪 Quantas portas prefere?"
-        elif "quilometragem" in missing_info:
-            return "🛣️ Qual a quilometragem máxima que aceita?"
-        else:
-            return "🤔 Que outras características são importantes para você?"
+        # Perguntas seguem a ordem de prioridade de _SIMPLE_QUESTIONS
+        missing = set(missing_info)
+        for info_type, question in _SIMPLE_QUESTIONS.items():
+            if info_type in missing:
+                return question
+        return "🤔 Que outras características são importantes para você?"
 
     def get_extract_preferences_prompt(
         self, user_input: str, previous_results: Optional[list[dict[str, Any]]] = None
@@ -552,17 +755,18 @@ class LLMInterface(ABC):
             Tupla (system_prompt, user_prompt)
 
         """
-        # Se há resultados anteriores, incluir contexto de refinamento
+        # Instruções estáticas primeiro e conteúdo dinâmico no final, para que o prefixo
+        # do prompt seja idêntico entre chamadas (cache de prefixo do provedor)
         if previous_results:
             context = self._build_refinement_context(previous_results)
-            user_prompt = f"""Contexto da busca anterior:
-{context}
+            user_prompt = f"""Extraia as preferências considerando que o usuário quer refinar a busca anterior.
 
-Nova solicitação do usuário: {user_input}
+Contexto da busca anterior:
+{context}
 
-Extraia as preferências considerando que o usuário quer refinar a busca anterior:"""
+Nova solicitação do usuário: {user_input}"""
         else:
-            user_prompt = f"Input do usuário: {user_input}\n\nExtraia as preferências:"
+            user_prompt = f"Extraia as preferências do input do usuário.\n\nInput do usuário: {user_input}"
 
         return (LLMPrompts.EXTRACT_PREFERENCES_SYSTEM, user_prompt)
 
@@ -608,7 +812,7 @@ Extraia as preferências considerando que o usuário quer refinar a busca anteri
                 car_info = f"{i}. {brand} {car_name} {car_model} {year_display} - {price_formatted} - Cor: {color} - Combustível: {fuel} - Transmissão: {transmission} - Quilometragem: {mileage_formatted} - Portas: {doors}"
                 context_lines.append(car_info)
             except Exception as e:
-                logger.warning(f"Erro ao formatar carro {i} para contexto: {e}")
+                logger.warning("Erro ao formatar carro %s para contexto: %s", i, e)
                 continue
 
         return "\n".join(context_lines)
@@ -628,44 +832,9 @@ Extraia as preferências considerando que o usuário quer refinar a busca anteri
         if not previous_results:
             return False
 
-        # Palavras-chave que indicam refinamento
-        refinement_keywords = [
-            "dessa lista",
-            "desses",
-            "desta lista",
-            "destes",
-            "me mostre os de",
-            "mostre apenas",
-            "filtre por",
-            "só os",
-            "apenas os",
-            "quero ver os",
-            "refinar",
-            "filtrar",
-            "especificar",
-        ]
-
+        # Palavras-chave de refinamento ou menção a características que podem ser filtros
         user_input_lower = user_input.lower()
-
-        # Verificar se contém palavras-chave de refinamento
-        for keyword in refinement_keywords:
-            if keyword in user_input_lower:
-                return True
-
-        # Verificar se menciona características específicas que podem ser filtros
-        specific_characteristics = [
-            "cor",
-            "preço",
-            "ano",
-            "combustível",
-            "transmissão",
-            "portas",
-            "quilometragem",
-            "marca",
-            "modelo",
-        ]
-
-        return any(char in user_input_lower for char in specific_characteristics)
+        return bool(_REFINEMENT_RE.search(user_input_lower) or _CHARACTERISTICS_RE.search(user_input_lower))
 
     def is_clear_filters_request(self, user_input: str) -> bool:
         """
@@ -678,24 +847,7 @@ Extraia as preferências considerando que o usuário quer refinar a busca anteri
             True se é uma solicitação de limpeza de filtros
 
         """
-        clear_keywords = [
-            "limpe os filtros",
-            "limpar filtros",
-            "limpe filtros",
-            "nova busca",
-            "nova pesquisa",
-            "começar do zero",
-            "resetar",
-            "limpar tudo",
-            "começar novo",
-            "apagar filtros",
-            "remover filtros",
-            "zerar",
-        ]
-
-        user_input_lower = user_input.lower()
-
-        return any(keyword in user_input_lower for keyword in clear_keywords)
+        return bool(_CLEAR_FILTERS_RE.search(user_input.lower()))
 
     def get_generate_filters_prompt(self, preferences: dict[str, Any]) -> tuple[str, str]:
         """
@@ -710,7 +862,7 @@ Extraia as preferências considerando que o usuário quer refinar a busca anteri
         """
         return (
             LLMPrompts.GENERATE_FILTERS_SYSTEM,
-            f"Preferências do usuário: {preferences}\n\nConverta em filtros MCP:",
+            f"Converta as preferências do usuário em filtros MCP.\n\nPreferências do usuário: {preferences}",
         )
 
     def get_format_results_prompt(
@@ -729,14 +881,19 @@ Extraia as preferências considerando que o usuário quer refinar a busca anteri
         """
         return (
             LLMPrompts.FORMAT_RESULTS_SYSTEM,
-            f"""Carros encontrados ({len(cars)} carros):
-{cars}
+            f"""Apresente os resultados de forma detalhada e amigável, listando todos os carros com suas características principais.
 
 Preferências do usuário: {user_preferences}
 
-Apresente os resultados de forma detalhada e amigável, listando todos os carros com suas características principais:""",
+Carros encontrados ({len(cars)} carros):
+{cars}""",
         )
 
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Estimativa barata de tokens (~4 caracteres por token)."""
+        return len(text) // 4 + 1
+
     def get_generate_question_prompt(self, preferences: dict[str, Any], missing_info: list[str]) -> tuple[str, str]:
         """
         Retorna o prompt e system prompt para geração de perguntas.
@@ -751,10 +908,10 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         """
         return (
             LLMPrompts.GENERATE_QUESTION_SYSTEM,
-            f"Preferências atuais: {preferences}\nInformações que faltam: {missing_info}\n\nGere uma pergunta:",
+            f"Gere uma pergunta.\n\nPreferências atuais: {preferences}\nInformações que faltam: {missing_info}",
         )
 
-    def get_generation_config(self, task: str) -> dict[str, Any]:
+    def get_generation_config(self, task: str) -> Mapping[str, Any]:
         """
         Retorna configuração de geração para uma tarefa específica.
 
@@ -765,7 +922,7 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
             Configuração de geração
 
         """
-        return LLMPrompts.GENERATION_CONFIGS.get(task, {"temperature": 0.7, "max_tokens": 200})
+        return LLMPrompts.GENERATION_CONFIGS.get(task, LLMPrompts.DEFAULT_GENERATION_CONFIG)
 
     def get_question_template(self, info_type: str) -> str:
         """
@@ -791,6 +948,14 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         """
         pass
 
+    def warm_up(self):
+        """
+        Prepara o provedor para a primeira requisição (ex.: carregar o modelo em memória).
+
+        Implementação padrão não faz nada; provedores com custo de inicialização devem sobrescrever.
+        """
+        logger.debug("Provedor %s não requer aquecimento", type(self).__name__)
+
     @abstractmethod
     def generate_response(
         self,
@@ -799,6 +964,7 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         temperature: float = 0.7,
         max_tokens: int = 1000,
         stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
         Gera resposta usando o modelo LLM.
@@ -809,6 +975,7 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
             temperature: Temperatura para geração (0.0 a 1.0)
             max_tokens: Número máximo de tokens
             stream: Se deve usar streaming
+            on_token: Callback chamado com cada trecho assim que é gerado (opcional)
 
         Returns:
             Resposta gerada pelo modelo
@@ -832,34 +999,27 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
             Dicionário com preferências extraídas
 
         """
+        # Entradas vazias/degeneradas sempre resultariam em {}: evitar a chamada à LLM
+        if not user_input or len(user_input.strip()) < LLMPrompts.MIN_INPUT_CHARS:
+            logger.debug("Entrada muito curta, ignorando extração de preferências")
+            return {}
+
         system_prompt, prompt = self.get_extract_preferences_prompt(user_input, previous_results)
         config = self.get_generation_config("extract_preferences")
 
         try:
-            response = self.generate_response(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=config["temperature"],
-                max_tokens=config["max_tokens"],
-            )
-
-            logger.debug(f"Resposta do sistema para extract_car_preferences: {response}")
-
             # Tentar extrair JSON da resposta
-            json_str = self._extract_json_from_response(response)
-            if json_str:
-                try:
-                    preferences = json.loads(json_str)
-                    return self._validate_preferences(preferences)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Erro ao decodificar JSON: {e}")
-                    return {}
-            else:
+            preferences = self._generate_json_response(
+                prompt, system_prompt, config["temperature"], config["max_tokens"]
+            )
+            if preferences is None:
                 logger.warning("Não foi possível extrair JSON da resposta")
                 return {}
 
+            return self._validate_preferences(preferences)
+
         except Exception as e:
-            logger.error(f"Erro ao extrair preferências: {e}")
+            logger.error("Erro ao extrair preferências: %s", e)
             return {}
 
     def generate_car_search_filters(self, preferences: dict[str, Any]) -> dict[str, Any]:
@@ -879,30 +1039,16 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         config = self.get_generation_config("generate_filters")
 
         try:
-            response = self.generate_response(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=config["temperature"],
-                max_tokens=config["max_tokens"],
-            )
-
             # Extrair JSON de forma mais robusta
-            json_str = self._extract_json_from_response(response)
-            if json_str:
-                try:
-                    filters = json.loads(json_str)
-                    filters = self._normalize_llm_filters(filters)
-                    return filters
-                except json.JSONDecodeError as e:
-                    logger.error(f"Erro ao decodificar JSON: {e}")
-                    # Fallback para conversão direta
-                    return self._convert_preferences_to_filters(preferences)
-            else:
-                logger.warning("Nenhum JSON encontrado na resposta, usando conversão direta")
+            filters = self._generate_json_response(prompt, system_prompt, config["temperature"], config["max_tokens"])
+            if filters is None:
+                logger.warning("Nenhum JSON válido encontrado na resposta, usando conversão direta")
                 return self._convert_preferences_to_filters(preferences)
 
+            return self._normalize_llm_filters(filters)
+
         except Exception as e:
-            logger.error(f"Erro ao gerar filtros: {e}")
+            logger.error("Erro ao gerar filtros: %s", e)
             # Fallback para conversão direta
             return self._convert_preferences_to_filters(preferences)
 
@@ -923,12 +1069,17 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         if not cars:
             return "😔 Não encontrei carros que atendam aos seus critérios. Que tal ajustarmos a busca?"
 
-        logger.info(f"Carros formatados com sucesso: {len(cars)} carros encontrados")
+        logger.info("Carros formatados com sucesso: %s carros encontrados", len(cars))
 
         # Usar formatação rápida direta (sem LLM)
         return self._format_cars_fast(cars, user_preferences)
 
-    def generate_next_question(self, current_preferences: dict[str, Any], missing_info: list[str]) -> str:
+    def generate_next_question(
+        self,
+        current_preferences: dict[str, Any],
+        missing_info: list[str],
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """
         Gerar próxima pergunta baseada no contexto.
 
@@ -937,6 +1088,7 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         Args:
             current_preferences: Preferências já coletadas
             missing_info: Informações que ainda faltam
+            on_token: Callback chamado com cada trecho da pergunta assim que é gerado (opcional)
 
         Returns:
             Próxima pergunta sugerida
@@ -949,17 +1101,23 @@ Apresente os resultados de forma detalhada e amigável, listando todos os carros
         system_prompt, prompt = self.get_generate_question_prompt(current_preferences, missing_info)
         config = self.get_generation_config("generate_question")
 
+        # Limite baixo para perguntas concisas; ainda menor quando falta só uma informação
+        max_tokens = config["max_tokens"]
+        if len(missing_info) == 1:
+            max_tokens = min(max_tokens, LLMPrompts.SINGLE_QUESTION_MAX_TOKENS)
+
         try:
             response = self.generate_response(
                 prompt=prompt,
                 system_prompt=system_prompt,
                 temperature=config["temperature"],
-                max_tokens=150,  # Limite baixo para perguntas concisas
+                max_tokens=max_tokens,
+                on_token=on_token,
             )
-            logger.debug(f"Resposta do sistema para next question: {response}")
+            logger.debug("Resposta do sistema para next question: %s", response)
             return response
 
         except Exception as e:
-            logger.error(f"Erro ao gerar pergunta: {e}")
+            logger.error("Erro ao gerar pergunta: %s", e)
             # Fallback para perguntas simples
             return self._generate_simple_question(missing_info)
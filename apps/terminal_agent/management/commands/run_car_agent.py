@@ -5,11 +5,15 @@ Este comando inicia uma sessão interativa no terminal onde o usuário
 pode conversar com o agente virtual para buscar carros.
 """
 
+import asyncio
 import logging
 import sys
+from dataclasses import dataclass, field
 from typing import Any
 
+from asgiref.sync import sync_to_async
 from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
 from rich.console import Console
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
@@ -20,23 +24,92 @@ from rich.text import Text
 from apps.terminal_agent.llm_factory import LLMFactory
 from apps.terminal_agent.llm_interface import LLMInterface
 from apps.web_sockets.mcp_handlers import CarMCPHandler
+from apps.web_sockets.serializers import CarFilterSerializer, PaginationSerializer
 
 logger = logging.getLogger(__name__)
 
+# Mensagem de despedida (estática, montada uma única vez)
+_GOODBYE_TEXT = Text.assemble(
+    ("Obrigado por usar o Assistente Virtual de Carros!", "green"),
+    "\n",
+    ("Espero ter ajudado você a encontrar o carro ideal! 🚗", "white"),
+)
+
+# Chaves de preferência com um bit cada na máscara de preferências preenchidas
+_PREFERENCE_KEYS = (
+    "nome",
+    "marca",
+    "modelo",
+    "faixa_preco",
+    "ano",
+    "combustivel",
+    "transmissao",
+    "cor",
+    "portas",
+    "quilometragem",
+    "uso",
+)
+_PREFERENCE_BITS = {key: 1 << index for index, key in enumerate(_PREFERENCE_KEYS)}
+
+# Informações perguntadas ao usuário -> bits que, se algum estiver presente, dispensam a pergunta
+_MISSING_INFO_BITS = (
+    ("marca", _PREFERENCE_BITS["marca"] | _PREFERENCE_BITS["modelo"]),
+    ("faixa_preco", _PREFERENCE_BITS["faixa_preco"]),
+    ("ano", _PREFERENCE_BITS["ano"]),
+)
+
+
+@dataclass(slots=True)
+class PreferenceState:
+    """Preferências acumuladas na conversa, com máscara de bits das chaves preenchidas."""
+
+    data: dict[str, Any] = field(default_factory=dict)
+    mask: int = 0
+
+    def update(self, preferences: dict[str, Any]):
+        """
+        Mescla novas preferências, atualizando a máscara apenas para as chaves recebidas.
+
+        Args:
+            preferences: Preferências extraídas no turno atual
+
+        """
+        self.data.update(preferences)
+        for key, value in preferences.items():
+            bit = _PREFERENCE_BITS.get(key, 0)
+            if value:
+                self.mask |= bit
+            else:
+                self.mask &= ~bit
+
+    def has_sufficient(self) -> bool:
+        """Indica se ao menos uma preferência está definida."""
+        return self.mask != 0
+
+    def missing(self) -> list[str]:
+        """Retorna as informações que ainda faltam, na ordem em que devem ser perguntadas."""
+        return [info for info, bits in _MISSING_INFO_BITS if not self.mask & bits]
+
 
 class Command(BaseCommand):
     """Comando para executar o agente virtual de carros."""
 
     help = "Executa o agente virtual conversacional para busca de carros"
 
+    # Paginação usada em todas as buscas do agente
+    SEARCH_PAGINATION = {"page": 1, "page_size": 10, "ordering": "-created_at"}
+
     def __init__(self, *args, **kwargs):
         """Inicializar o comando do agente de carros."""
         super().__init__(*args, **kwargs)
         self.console = Console()
         self.mcp_handler = CarMCPHandler()
         self.llm: LLMInterface | None = None  # Será inicializado no handle()
+        self._loop: asyncio.AbstractEventLoop | None = None  # Criado sob demanda em _get_loop()
+        self._pagination_data: dict[str, Any] | None = None  # Validada uma única vez em _search_cars()
+        self._streamed_parts: list[str] = []  # Trechos já exibidos no terminal durante a geração
         self.conversation_state = {
-            "preferences": {},
+            "preferences": PreferenceState(),
             "search_history": [],
             "current_results": [],
         }
@@ -80,6 +153,9 @@ class Command(BaseCommand):
             # Tentar recriar com fallback
             self.llm = LLMFactory.create_llm("simple")
 
+        # Carregar o modelo em segundo plano enquanto a sessão é preparada
+        self.llm.warm_up()
+
         # Iniciar agente
         self._start_agent()
 
@@ -126,28 +202,47 @@ class Command(BaseCommand):
         if not is_piped:
             self.console.clear()
 
-        # Mostrar carregamento inicial
-        with Status("[bold green]Inicializando agente virtual...", spinner="dots") as status:
-            status.update("[bold green]Carregando modelos de IA...")
-            # Simular carregamento inicial
-            import time
+            # Aquecimento real enquanto o spinner é exibido (no modo pipe, segue direto para o processamento)
+            with Status("[bold green]Conectando ao banco de dados...", spinner="dots"):
+                self._warm_up_database()
 
-            time.sleep(1)
+        self._display_welcome()
 
-            status.update("[bold green]Conectando ao banco de dados...")
-            time.sleep(0.5)
+        try:
+            if is_piped:
+                # Modo pipe - processar entrada do stdin
+                self._process_piped_input()
+            else:
+                # Modo interativo - loop normal
+                self._process_interactive_input()
+        finally:
+            self._close_loop()
 
-            status.update("[bold green]Preparando interface...")
-            time.sleep(0.5)
+    def _warm_up_database(self):
+        """Abre a conexão com o banco na thread usada pelas buscas MCP, antes da primeira pergunta."""
 
-        self._display_welcome()
+        def ensure_connection():
+            # Conexões do Django são por thread: a conexão é buscada aqui dentro, já na thread do sync_to_async
+            # usada pelo handler (connection.ensure_connection resolveria a conexão da thread principal)
+            connections[DEFAULT_DB_ALIAS].ensure_connection()
 
-        if is_piped:
-            # Modo pipe - processar entrada do stdin
-            self._process_piped_input()
-        else:
-            # Modo interativo - loop normal
-            self._process_interactive_input()
+        try:
+            self._get_loop().run_until_complete(sync_to_async(ensure_connection)())
+        except DatabaseError as e:
+            logger.warning(f"Não foi possível conectar ao banco de dados: {e}")
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Retorna o event loop da sessão, criando-o na primeira chamada e reutilizando nas demais."""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+        return self._loop
+
+    def _close_loop(self):
+        """Encerra o event loop da sessão, se foi criado."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self._loop = None
 
     def _process_piped_input(self):
         """Processa entrada via pipe."""
@@ -191,30 +286,24 @@ class Command(BaseCommand):
         llm_type = type(self.llm).__name__
         llm_info = f"Powered by Ollama ({self.llm.model})" if "Ollama" in llm_type else "Powered by SimpleLLM"
 
-        welcome_text = Text()
-        welcome_text.append("🚗 ", style="bold blue")
-        welcome_text.append("Assistente Virtual de Carros", style="bold green")
-        welcome_text.append(f"\n[dim]{llm_info}[/dim]", style="dim")
-        welcome_text.append("\n\n", style="white")
-        welcome_text.append("Olá! Sou seu assistente virtual para busca de carros.", style="white")
-        welcome_text.append("\n", style="white")
-        welcome_text.append("Posso te ajudar a encontrar o carro ideal baseado nas suas preferências.", style="white")
-        welcome_text.append("\n\n", style="white")
-        welcome_text.append("Digite 'sair' para encerrar a conversa.", style="dim")
-
-        logger.info("🤖 Agente Virtual iniciado")
+        logger.info(f"🤖 Agente Virtual iniciado - {llm_info}")
 
     def _display_goodbye(self):
         """Exibe mensagem de despedida."""
-        goodbye_text = Text()
-        goodbye_text.append("Obrigado por usar o Assistente Virtual de Carros!", style="green")
-        goodbye_text.append("\n", style="white")
-        goodbye_text.append("Espero ter ajudado você a encontrar o carro ideal! 🚗", style="white")
-
-        self.console.print(Panel(goodbye_text, title="👋 Até logo!", border_style="green"))
+        self.console.print(Panel(_GOODBYE_TEXT, title="👋 Até logo!", border_style="green"))
 
     def _display_agent_response(self, response: str):
         """Exibe resposta do agente."""
+        streamed = "".join(self._streamed_parts)
+        self._streamed_parts.clear()
+        if streamed:
+            # Encerrar a linha do texto exibido trecho a trecho
+            self.console.print()
+            # O painel só é dispensado se o texto exibido for a resposta final; geração interrompida,
+            # fallback ou mensagem de erro seguem no painel abaixo
+            if streamed == response:
+                return
+
         agent_text = Text()
         agent_text.append("🤖 ", style="bold blue")
         agent_text.append("Assistente", style="bold blue")
@@ -252,7 +341,7 @@ class Command(BaseCommand):
                     # Para refinamento, manter preferências anteriores e adicionar novas
                     preferences = self.llm.extract_car_preferences(user_input, previous_results)
                     # Manter preferências anteriores que não foram alteradas
-                    for key, value in self.conversation_state["preferences"].items():
+                    for key, value in self.conversation_state["preferences"].data.items():
                         if key not in preferences or preferences[key] is None:
                             preferences[key] = value
                 else:
@@ -268,7 +357,7 @@ class Command(BaseCommand):
                 if self._has_sufficient_info():
                     # Passo 2: Gerar filtros MCP
                     task2 = progress.add_task("🔧 Convertendo preferências em filtros de busca...", total=None)
-                    filters = self.llm.generate_car_search_filters(self.conversation_state["preferences"])
+                    filters = self.llm.generate_car_search_filters(self.conversation_state["preferences"].data)
                     progress.update(task2, description="✅ Filtros gerados com sucesso!")
 
                     # Passo 3: Buscar carros via MCP
@@ -281,7 +370,7 @@ class Command(BaseCommand):
                         # Passo 4: Formatar resultados
                         task4 = progress.add_task("📝 Formatando resultados...", total=None)
                         response = self.llm.format_car_results(
-                            search_results["results"], self.conversation_state["preferences"]
+                            search_results["results"], self.conversation_state["preferences"].data
                         )
                         progress.update(task4, description="✅ Resultados formatados!")
 
@@ -297,7 +386,18 @@ class Command(BaseCommand):
                     # Passo 2: Gerar próxima pergunta
                     task2 = progress.add_task("❓ Gerando pergunta de esclarecimento...", total=None)
                     missing_info = self._get_missing_info()
-                    response = self.llm.generate_next_question(self.conversation_state["preferences"], missing_info)
+
+                    def on_token(token: str):
+                        # No primeiro trecho, encerrar o spinner e exibir a pergunta à medida que é gerada
+                        if not self._streamed_parts:
+                            progress.stop()
+                            self.console.print("\n[bold blue]🤖 Assistente[/bold blue]\n")
+                        self._streamed_parts.append(token)
+                        self.console.print(token, end="", soft_wrap=True, markup=False)
+
+                    response = self.llm.generate_next_question(
+                        self.conversation_state["preferences"].data, missing_info, on_token=on_token
+                    )
                     progress.update(task2, description="✅ Pergunta gerada!")
 
             return response
@@ -308,30 +408,18 @@ class Command(BaseCommand):
 
     def _has_sufficient_info(self) -> bool:
         """Verifica se temos informações suficientes para buscar."""
-        prefs = self.conversation_state["preferences"]
-
         # Pelo menos uma preferência deve estar definida
-        return any(prefs.values())
+        return self.conversation_state["preferences"].has_sufficient()
 
     def _get_missing_info(self) -> list:
         """Retorna lista de informações que ainda faltam."""
-        prefs = self.conversation_state["preferences"]
-        missing: list[str] = []
-
         # Chaves esperadas pela LLM para geração de perguntas
-        if not prefs.get("marca") and not prefs.get("modelo"):
-            missing.append("marca")
-        if not prefs.get("faixa_preco"):
-            missing.append("faixa_preco")
-        if not prefs.get("ano"):
-            missing.append("ano")
-
-        return missing
+        return self.conversation_state["preferences"].missing()
 
     def _clear_conversation_state(self):
         """Limpa o estado da conversa para começar uma nova busca."""
         self.conversation_state = {
-            "preferences": {},
+            "preferences": PreferenceState(),
             "search_history": [],
             "current_results": [],
         }
@@ -340,8 +428,6 @@ class Command(BaseCommand):
     def _search_cars(self, filters: dict[str, Any]) -> dict[str, Any]:
         """Executa busca de carros via MCP."""
         try:
-            from apps.web_sockets.serializers import CarFilterSerializer, PaginationSerializer
-
             # Remover valores None dos filtros
             clean_filters = {k: v for k, v in filters.items() if v is not None}
 
@@ -352,27 +438,25 @@ class Command(BaseCommand):
                 logger.error(f"Filtros inválidos: {filter_serializer.errors}")
                 return {"results": [], "total": 0}
 
-            pagination_serializer = PaginationSerializer(data={"page": 1, "page_size": 10, "ordering": "-created_at"})
-            if not pagination_serializer.is_valid():
-                logger.error(f"Paginação inválida: {pagination_serializer.errors}")
-                return {"results": [], "total": 0}
+            # A paginação é constante: validar apenas na primeira busca da sessão
+            if self._pagination_data is None:
+                pagination_serializer = PaginationSerializer(data=self.SEARCH_PAGINATION)
+                if not pagination_serializer.is_valid():
+                    logger.error(f"Paginação inválida: {pagination_serializer.errors}")
+                    return {"results": [], "total": 0}
+                self._pagination_data = pagination_serializer.validated_data
 
             # Construir payload MCP (compatível com CarMCPHandler)
             mcp_request = {
                 "data": {
                     "action": "search_cars",
                     **filter_serializer.validated_data,
-                    **pagination_serializer.validated_data,
+                    **self._pagination_data,
                 }
             }
 
-            # Chamar handler MCP de forma assíncrona
-            import asyncio
-
-            async def _call_handler():
-                return await self.mcp_handler.handle_request(mcp_request)
-
-            response = asyncio.run(_call_handler())
+            # Chamar handler MCP no event loop persistente da sessão
+            response = self._get_loop().run_until_complete(self.mcp_handler.handle_request(mcp_request))
 
             # Normalizar resposta
             if response.get("success"):
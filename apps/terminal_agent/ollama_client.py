@@ -8,19 +8,69 @@ locais para processamento de linguagem natural.
 
 import json
 import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
 from typing import Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .llm_base import LLMBase
-from .llm_interface import LLMInterface
+from .llm_config import OLLAMA_AVAILABILITY_TIMEOUT
+from .llm_interface import LLMInterface, json_loads
 
 logger = logging.getLogger(__name__)
 
+# Sessões HTTP compartilhadas por URL base: novos clientes reaproveitam o pool de conexões keep-alive
+_SESSIONS: dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    """Cria sessão HTTP com keep-alive, retry e pool de conexões otimizado."""
+    session = requests.Session()
+
+    # Configurações de performance para a sessão
+    session.headers.update({"Connection": "keep-alive", "Keep-Alive": "timeout=30, max=100"})
+
+    # Adapter com pool de conexões otimizado
+    retry_strategy = Retry(
+        total=3,
+        backoff_factor=0.1,
+        status_forcelist=[429, 500, 502, 503, 504],
+    )
+
+    adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=20, pool_block=False)
+
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _get_session(base_url: str) -> requests.Session:
+    """Retorna a sessão compartilhada para a URL base, criando-a na primeira vez."""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(base_url)
+        if session is None:
+            session = _SESSIONS[base_url] = _build_session()
+        return session
+
 
 class OllamaClient(LLMInterface, LLMBase):
     """Cliente para comunicação com Ollama via API REST."""
 
+    # Tempo que o Ollama mantém o modelo carregado entre requisições. Com o modelo em memória,
+    # o servidor reaproveita o prefixo já processado (system prompt) em vez de tokenizá-lo de novo.
+    keep_alive = "30m"
+
+    # Segundos durante os quais uma sondagem bem-sucedida de is_available() é reaproveitada
+    availability_ttl = 30.0
+
+    # Timeout da sondagem de disponibilidade (configurável por OLLAMA_AVAILABILITY_TIMEOUT)
+    availability_timeout = OLLAMA_AVAILABILITY_TIMEOUT
+
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.1:8b"):
         """
         Inicializa o cliente Ollama.
@@ -32,25 +82,8 @@ class OllamaClient(LLMInterface, LLMBase):
         """
         self.base_url = base_url
         self.model = model
-        self.session = requests.Session()
-
-        # Configurações de performance para a sessão
-        self.session.headers.update({"Connection": "keep-alive", "Keep-Alive": "timeout=30, max=100"})
-
-        # Adapter com pool de conexões otimizado
-        from requests.adapters import HTTPAdapter
-        from urllib3.util.retry import Retry
-
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=0.1,
-            status_forcelist=[429, 500, 502, 503, 504],
-        )
-
-        adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=10, pool_maxsize=20, pool_block=False)
-
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        self.session = _get_session(base_url)
+        self._available_checked_at: Optional[float] = None
 
     def is_available(self) -> bool:
         """
@@ -60,12 +93,37 @@ class OllamaClient(LLMInterface, LLMBase):
             True se disponível, False caso contrário
 
         """
+        now = time.monotonic()
+        if self._available_checked_at is not None and now - self._available_checked_at < self.availability_ttl:
+            return True
+
         try:
-            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=self.availability_timeout)
+            available = response.status_code == 200
         except Exception as e:
             logger.warning(f"Ollama não disponível: {e}")
-            return False
+            available = False
+
+        # Só o sucesso é memorizado: um servidor lento ou reiniciando volta a ser sondado na próxima chamada
+        self._available_checked_at = now if available else None
+        return available
+
+    def warm_up(self):
+        """Carrega o modelo no Ollama em segundo plano, tirando o tempo de carga da primeira pergunta."""
+        threading.Thread(target=self._load_model, name="ollama-warm-up", daemon=True).start()
+
+    def _load_model(self):
+        """Pede ao Ollama que carregue o modelo (mensagens vazias carregam sem gerar texto)."""
+        try:
+            response = self.session.post(
+                f"{self.base_url}/api/chat",
+                json={"model": self.model, "messages": [], "keep_alive": self.keep_alive},
+                timeout=60,
+            )
+            response.raise_for_status()
+            logger.info(f"Modelo {self.model} carregado no Ollama")
+        except requests.RequestException as e:
+            logger.warning(f"Não foi possível pré-carregar o modelo {self.model}: {e}")
 
     def get_available_models(self) -> list[dict[str, Any]]:
         """
@@ -78,7 +136,7 @@ class OllamaClient(LLMInterface, LLMBase):
         try:
             response = self.session.get(f"{self.base_url}/api/tags")
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             return data.get("models", [])
         except Exception as e:
             logger.error(f"Erro ao obter modelos: {e}")
@@ -91,6 +149,7 @@ class OllamaClient(LLMInterface, LLMBase):
         temperature: float = 0.7,
         max_tokens: int = 1000,
         stream: bool = True,  # Mudança: streaming por padrão para melhor UX
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> str:
         """
         Gera resposta usando o modelo Ollama.
@@ -101,69 +160,104 @@ class OllamaClient(LLMInterface, LLMBase):
             temperature: Temperatura para geração (0.0 a 1.0)
             max_tokens: Número máximo de tokens
             stream: Se deve usar streaming (recomendado para melhor performance)
+            on_token: Callback chamado com cada trecho assim que chega (sem streaming, recebe a resposta inteira)
 
         Returns:
             Resposta gerada pelo modelo
 
         """
         try:
-            # Construir prompt completo
-            full_prompt = prompt
-            if system_prompt:
-                full_prompt = f"System: {system_prompt}\n\nUser: {prompt}"
-
-            payload = {
-                "model": self.model,
-                "prompt": full_prompt,
-                "stream": stream,
-                "options": {
-                    "temperature": temperature,
-                    "num_predict": max_tokens,
-                    "top_p": 0.9,  # Otimização: reduz diversidade desnecessária
-                    "top_k": 40,  # Otimização: limita vocabulário
-                    "repeat_penalty": 1.1,  # Evita repetições
-                    "stop": ["User:", "System:"],  # Removido \n\n para permitir quebras de linha
-                },
-            }
-
-            response = self.session.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=60,  # Timeout otimizado
-                stream=stream,
-            )
-            response.raise_for_status()
+            payload = self._build_payload(prompt, system_prompt, temperature, max_tokens, stream)
+            response = self._post_chat(payload, stream)
 
             if stream:
-                return self._handle_streaming_response(response)
+                return self._handle_streaming_response(response, on_token)
             else:
-                data = response.json()
-                return data.get("response", "")
+                data = json_loads(response.content)
+                text = (data.get("message") or {}).get("content", "")
+                if on_token:
+                    on_token(text)
+                return text
 
-        except requests.exceptions.Timeout as e:
-            logger.error(f"Timeout ao gerar resposta (60s): {e}")
-            return "⏰ A resposta está demorando muito. Tente novamente ou simplifique sua busca."
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"Erro de conexão com Ollama: {e}")
-            return "🔌 Erro de conexão com o servidor Ollama. Verifique se está rodando."
         except Exception as e:
-            logger.error(f"Erro ao gerar resposta: {e}")
-            return f"❌ Erro ao processar solicitação: {str(e)[:100]}..."
+            return self._handle_request_error(e)
+
+    def _build_payload(
+        self, prompt: str, system_prompt: Optional[str], temperature: float, max_tokens: int, stream: bool
+    ) -> dict[str, Any]:
+        """Monta o payload da requisição /api/chat."""
+        # System prompt estático em mensagem própria, dados dinâmicos apenas na mensagem do usuário:
+        # o prefixo fica idêntico entre chamadas e o Ollama reaproveita o KV-cache dele
+        messages = []
+        options = {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+            "top_p": 0.9,  # Otimização: reduz diversidade desnecessária
+            "top_k": 40,  # Otimização: limita vocabulário
+            "repeat_penalty": 1.1,  # Evita repetições
+        }
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+            # Mantém os tokens do system prompt no contexto mesmo quando ele precisa ser deslocado
+            options["num_keep"] = self._estimate_tokens(system_prompt)
+        messages.append({"role": "user", "content": prompt})
+
+        return {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": options,
+        }
+
+    def _post_chat(self, payload: dict[str, Any], stream: bool) -> requests.Response:
+        """Envia o payload para /api/chat e valida o status da resposta."""
+        response = self.session.post(
+            f"{self.base_url}/api/chat",
+            json=payload,
+            timeout=60,  # Timeout otimizado
+            stream=stream,
+        )
+        response.raise_for_status()
+        return response
 
-    def _handle_streaming_response(self, response) -> str:
-        """Processa resposta em streaming."""
-        full_response = ""
-        for line in response.iter_lines():
+    def _handle_request_error(self, error: Exception) -> str:
+        """Registra o erro da requisição e retorna mensagem amigável para o usuário."""
+        if isinstance(error, requests.exceptions.Timeout):
+            logger.error(f"Timeout ao gerar resposta (60s): {error}")
+            return "⏰ A resposta está demorando muito. Tente novamente ou simplifique sua busca."
+        if isinstance(error, requests.exceptions.ConnectionError):
+            logger.error(f"Erro de conexão com Ollama: {error}")
+            return "🔌 Erro de conexão com o servidor Ollama. Verifique se está rodando."
+        logger.error(f"Erro ao gerar resposta: {error}")
+        return f"❌ Erro ao processar solicitação: {str(error)[:100]}..."
+
+    def _handle_streaming_response(self, response, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Processa resposta em streaming, repassando cada trecho ao callback quando informado."""
+        if on_token is None:
+            return "".join(self._iter_stream_tokens(response))
+
+        parts = []
+        for token in self._iter_stream_tokens(response):
+            on_token(token)
+            parts.append(token)
+        return "".join(parts)
+
+    def _iter_stream_tokens(self, response) -> Iterator[str]:
+        """Itera sobre os trechos de texto de uma resposta em streaming do Ollama."""
+        # Linhas em bytes vão direto para o decoder (sem decodificar para str antes); com transferência
+        # chunked cada pedaço chega assim que enviado, então o buffer maior não atrasa os tokens
+        for line in response.iter_lines(chunk_size=8192, decode_unicode=False):
             if line:
                 try:
-                    data = json.loads(line.decode("utf-8"))
-                    if "response" in data:
-                        full_response += data["response"]
+                    data = json_loads(line)
+                    content = (data.get("message") or {}).get("content")
+                    if content:
+                        yield content
                     if data.get("done", False):
                         break
                 except json.JSONDecodeError:
                     continue
-        return full_response
 
     def extract_car_preferences(
         self, user_input: str, previous_results: Optional[list[dict[str, Any]]] = None
@@ -214,7 +308,12 @@ class OllamaClient(LLMInterface, LLMBase):
         """
         return super().format_car_results(cars, user_preferences)
 
-    def generate_next_question(self, current_preferences: dict[str, Any], missing_info: list[str]) -> str:
+    def generate_next_question(
+        self,
+        current_preferences: dict[str, Any],
+        missing_info: list[str],
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """
         Gerar próxima pergunta baseada no contexto usando LLM otimizada.
 
@@ -223,12 +322,13 @@ class OllamaClient(LLMInterface, LLMBase):
         Args:
             current_preferences: Preferências já coletadas
             missing_info: Informações que ainda faltam
+            on_token: Callback chamado com cada trecho da pergunta assim que é gerado (opcional)
 
         Returns:
             Próxima pergunta sugerida
 
         """
-        return super().generate_next_question(current_preferences, missing_info)
+        return super().generate_next_question(current_preferences, missing_info, on_token)
 
 
 # Instância global do cliente
@@ -6,6 +6,8 @@ de serviços externos, ideal para desenvolvimento e testes.
 """
 
 import logging
+import re
+from collections.abc import Callable
 from typing import Any, Optional
 
 from .llm_base import LLMBase
@@ -13,6 +15,13 @@ from .llm_interface import LLMInterface
 
 logger = logging.getLogger(__name__)
 
+# Palavras-chave do prompt -> método que gera a resposta, em ordem de prioridade
+_RESPONSE_DISPATCH = (
+    (re.compile(r"preferências|preferences"), "_generate_preferences_response"),
+    (re.compile(r"filtros|filters"), "_generate_filters_response"),
+    (re.compile(r"formatar|format"), "_generate_format_response"),
+)
+
 
 class SimpleLLM(LLMInterface, LLMBase):
     """Implementação simples de LLM para desenvolvimento e testes."""
@@ -32,21 +41,20 @@ class SimpleLLM(LLMInterface, LLMBase):
         temperature: float = 0.7,
         max_tokens: int = 1000,
         stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None,
     ) -> str:
         """Gera resposta simples baseada no prompt."""
-        # Resposta simples baseada no contexto
-        if (
-            "preferências" in prompt.lower()
-            or "preferences" in prompt.lower()
-            or "extraia as preferências" in prompt.lower()
-        ):
-            return self._generate_preferences_response(prompt)
-        elif "filtros" in prompt.lower() or "filters" in prompt.lower():
-            return self._generate_filters_response(prompt)
-        elif "formatar" in prompt.lower() or "format" in prompt.lower():
-            return self._generate_format_response(prompt)
-        else:
-            return "Resposta simples gerada."
+        # Resposta simples baseada no contexto (prompt convertido para minúsculas uma única vez)
+        prompt_lower = prompt.lower()
+        response = next(
+            (getattr(self, method)(prompt) for pattern, method in _RESPONSE_DISPATCH if pattern.search(prompt_lower)),
+            "Resposta simples gerada.",
+        )
+
+        # Sem streaming real: o callback recebe a resposta inteira de uma vez
+        if on_token:
+            on_token(response)
+        return response
 
     def extract_car_preferences(
         self, user_input: str, previous_results: Optional[list[dict[str, Any]]] = None
@@ -65,10 +73,15 @@ class SimpleLLM(LLMInterface, LLMBase):
         # Usar implementação compartilhada da interface
         return super().format_car_results(cars, user_preferences)
 
-    def generate_next_question(self, preferences: dict[str, Any], missing_info: list[str]) -> str:
+    def generate_next_question(
+        self,
+        preferences: dict[str, Any],
+        missing_info: list[str],
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
         """Gera próxima pergunta simples usando implementação compartilhada."""
         # Usar implementação compartilhada da interface
-        return super().generate_next_question(preferences, missing_info)
+        return super().generate_next_question(preferences, missing_info, on_token)
 
     def _generate_preferences_response(self, prompt: str) -> str:
         """Gera resposta para extração de preferências."""
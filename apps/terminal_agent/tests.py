@@ -0,0 +1,59 @@
+"""Tests for the terminal agent app."""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.terminal_agent.llm_config import _env_float
+from apps.terminal_agent.management.commands.run_car_agent import PreferenceState
+
+
+class TestPreferenceState(SimpleTestCase):
+    """Test the preference bitmask kept across the conversation."""
+
+    def test_empty_state(self):
+        """A new state has no preferences and asks for everything."""
+        state = PreferenceState()
+
+        self.assertFalse(state.has_sufficient())
+        self.assertEqual(state.missing(), ["marca", "faixa_preco", "ano"])
+
+    def test_update_sets_bits_for_filled_keys(self):
+        """Filled keys mark their bit; modelo also satisfies the marca question."""
+        state = PreferenceState()
+        state.update({"modelo": "Corolla", "ano": 2020})
+
+        self.assertTrue(state.has_sufficient())
+        self.assertEqual(state.missing(), ["faixa_preco"])
+        self.assertEqual(state.data, {"modelo": "Corolla", "ano": 2020})
+
+    def test_update_clears_bits_for_empty_values(self):
+        """An empty value for a key clears its bit."""
+        state = PreferenceState()
+        state.update({"marca": "Toyota", "faixa_preco": "até 100 mil"})
+        state.update({"marca": "", "faixa_preco": None})
+
+        self.assertFalse(state.has_sufficient())
+        self.assertEqual(state.missing(), ["marca", "faixa_preco", "ano"])
+
+    def test_unknown_keys_do_not_count(self):
+        """Keys outside the known preferences are kept but do not set any bit."""
+        state = PreferenceState()
+        state.update({"outra_coisa": "valor"})
+
+        self.assertFalse(state.has_sufficient())
+        self.assertEqual(state.data, {"outra_coisa": "valor"})
+
+
+class TestEnvFloat(SimpleTestCase):
+    """Test the tolerant parsing of numeric LLM settings."""
+
+    def test_values(self):
+        """Valid positive numbers are used; missing, invalid or non-positive values fall back to the default."""
+        cases = {"2.5": 2.5, "abc": 5.0, "": 5.0, "0": 5.0, "-1": 5.0}
+        for raw, expected in cases.items():
+            with self.subTest(raw=raw), mock.patch.dict("os.environ", {"OLLAMA_AVAILABILITY_TIMEOUT": raw}):
+                self.assertEqual(_env_float("OLLAMA_AVAILABILITY_TIMEOUT", 5.0), expected)
+
+        with mock.patch.dict("os.environ", clear=True):
+            self.assertEqual(_env_float("OLLAMA_AVAILABILITY_TIMEOUT", 5.0), 5.0)
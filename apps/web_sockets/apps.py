@@ -1,14 +1,16 @@
 """
 Django app configuration for WebSocket functionality.
 
-This module configures the WebSocket application and handles automatic
-discovery of socket modules across installed apps.
+This module configures the WebSocket application, handles automatic
+discovery of socket modules across installed apps and connects the
+MCP catalog cache invalidation signals.
 """
 
 from importlib import import_module
 
-from django.apps import AppConfig
-from django.conf import settings
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import module_has_submodule
 
 
 class WebSocketsConfig(AppConfig):
@@ -18,10 +20,18 @@ class WebSocketsConfig(AppConfig):
     name = "apps.web_sockets"
 
     def ready(self):
-        """Initialize the app and discover socket modules."""
-        # Auto Discover modules to sockets
-        for app in settings.INSTALLED_APPS:
-            try:
-                import_module(f"{app}.sockets")
-            except (AttributeError, ModuleNotFoundError):
-                continue
+        """Initialize the app, discover socket modules and connect the catalog cache signals."""
+        # Auto Discover modules to sockets: check the spec first so apps without
+        # a sockets module are skipped without a failed import, and errors raised
+        # inside an existing sockets module are not swallowed
+        for app_config in apps.get_app_configs():
+            if module_has_submodule(app_config.module, "sockets"):
+                import_module(f"{app_config.name}.sockets")
+
+        # Invalidação do cache de catálogo MCP: conectada aqui, e não no import do módulo, para valer
+        # mesmo que nada importe mcp_rest_integration antes de um save/delete
+        from apps.web_sockets.mcp_rest_integration import CATALOG_MODELS, clear_catalog_cache
+
+        for model in CATALOG_MODELS:
+            post_save.connect(clear_catalog_cache, sender=model, dispatch_uid=f"mcp_catalog_save_{model.__name__}")
+            post_delete.connect(clear_catalog_cache, sender=model, dispatch_uid=f"mcp_catalog_delete_{model.__name__}")
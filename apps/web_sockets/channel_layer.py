@@ -5,9 +5,18 @@ This module provides an extended Redis channel layer with additional
 functionality for managing WebSocket groups and connections.
 """
 
+import hashlib
 import time
 
 from channels_redis.core import RedisChannelLayer
+from redis.exceptions import NoScriptError
+
+# Discard expired channels and return the remaining ones in a single round trip
+_GROUP_CHANNELS_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, ARGV[1])
+return redis.call('ZRANGE', KEYS[1], 0, -1)
+"""
+_GROUP_CHANNELS_SCRIPT_SHA = hashlib.sha1(_GROUP_CHANNELS_SCRIPT.encode("utf8"), usedforsecurity=False).hexdigest()
 
 
 class ExtendedRedisChannelLayer(RedisChannelLayer):
@@ -15,20 +24,25 @@ class ExtendedRedisChannelLayer(RedisChannelLayer):
 
     async def get_group_channels(self, group):
         """Get all channels in a group."""
-        if not self.valid_group_name(group):
-            raise ValueError(f"Group name '{group}' is not valid")
+        # Same check as group_add: precompiled class regex, raises TypeError for invalid names
+        self.require_valid_group_name(group)
 
         key = self._group_key(group)
         connection = self.connection(self.consistent_hash(group))
         # Discard old channels based on group_expiry
-        await connection.zremrangebyscore(key, min=0, max=int(time.time()) - self.group_expiry)
+        max_score = int(time.time()) - self.group_expiry
+        try:
+            channels = await connection.evalsha(_GROUP_CHANNELS_SCRIPT_SHA, 1, key, max_score)
+        except NoScriptError:
+            # Script not cached on this server yet: EVAL runs and caches it
+            channels = await connection.eval(_GROUP_CHANNELS_SCRIPT, 1, key, max_score)
 
-        return [x.decode("utf8") for x in await connection.zrange(key, 0, -1)]
+        return list(map(bytes.decode, channels))
 
     async def count_group_connections(self, group):
         """Count the number of connections in a group."""
-        if not self.valid_group_name(group):
-            raise ValueError(f"Group name '{group}' is not valid")
+        # Same check as group_add: precompiled class regex, raises TypeError for invalid names
+        self.require_valid_group_name(group)
 
         key = self._group_key(group)
         connection = self.connection(self.consistent_hash(group))
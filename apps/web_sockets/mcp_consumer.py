@@ -5,15 +5,18 @@ Este módulo implementa o consumer WebSocket que processa requisições MCP,
 permitindo busca dinâmica de carros com filtros em tempo real.
 """
 
+import asyncio
+import contextlib
 import json
 import logging
-from datetime import datetime
+from collections import deque
 from typing import Any
 
+import msgpack
 from rest_framework.permissions import AllowAny
 
-from apps.web_sockets.mcp_handlers import CarMCPHandler
-from apps.web_sockets.views_sockets import AbstractSocket
+from apps.web_sockets.mcp_handlers import CarMCPHandler, new_request_id, now_iso
+from apps.web_sockets.views_sockets import AbstractSocket, dumps_frame, dumps_frame_bytes, loads_frame, splice_frame
 
 logger = logging.getLogger(__name__)
 
@@ -24,20 +27,132 @@ class MCPCarSocket(AbstractSocket):
 
     Este consumer implementa o protocolo MCP sobre WebSocket V1,
     permitindo busca dinâmica de carros com filtros em tempo real.
+    O MCP-V1 puro recebe sempre JSON em frames de texto; os demais
+    recursos de framing só valem para quem pede o subprotocolo deles.
     """
 
     current_protocol = "MCP-V1"
+    # Subprotocolos aceitos e os recursos de framing que cada um liga
+    protocol_features = {
+        "MCP-V1": frozenset(),
+        "MCP-V1-binary": frozenset({"binary"}),  # Respostas grandes em frame binário (JSON em UTF-8)
+        "MCP-V1-batch": frozenset({"batch"}),  # Frames do mesmo tick agrupados em um mcp_batch
+        "MCP-V1-binary-batch": frozenset({"binary", "batch"}),
+        "MCP-V2-msgpack": frozenset({"msgpack"}),  # Todos os frames em MessagePack
+    }
     permission_classes = [AllowAny]
+    # Com MCP-V1-binary, respostas maiores que isso (em bytes) vão em frame binário, sem validação UTF-8 nas pontas
+    binary_frame_threshold = 4096
+    # Limite de frames na fila de saída do envio agrupado; cheia, quem envia espera o flusher
+    out_queue_maxsize = 256
 
     def __init__(self, *args, **kwargs):
         """Inicializa o consumer MCP."""
         super().__init__(*args, **kwargs)
         self.mcp_handler = None
-        self.search_history = []  # Histórico de buscas por sessão
+        self.search_history = deque(maxlen=50)  # Histórico de buscas por sessão (mantém as últimas 50)
+        # Definidos no connect() conforme o subprotocolo negociado
+        self.use_msgpack = False
+        self.use_binary_frames = False
+        self.use_batching = False
+        # Frames de saída acumulados no tick atual; o flusher os envia juntos em um único frame
+        self._out_queue: asyncio.Queue = asyncio.Queue(maxsize=self.out_queue_maxsize)
+        self._flusher: asyncio.Task | None = None
 
     async def send_json(self, data):
-        """Envia dados como JSON via WebSocket."""
-        await self.send(text_data=json.dumps(data, default=str))
+        """
+        Envia dados como JSON via WebSocket.
+
+        Com o envio agrupado negociado (subprotocolos *-batch), o frame vai para a fila de saída e é
+        enviado pelo flusher, que agrupa os frames produzidos no mesmo tick do event loop; fora
+        disso (ou se o flusher já terminou), envia direto.
+
+        Args:
+            data: Dados a serem enviados
+
+        """
+        if self._flusher is None or self._flusher.done():
+            await self._send_frame(data)
+            return
+
+        await self._out_queue.put(data)
+        if self._flusher.done():
+            # O flusher terminou enquanto este envio esperava vaga na fila: ninguém mais vai lê-la
+            while not self._out_queue.empty():
+                await self._send_frame(self._out_queue.get_nowait())
+
+    async def send_bytes(self, data):
+        """Envia dados como JSON (UTF-8) em um frame binário via WebSocket."""
+        await self.send(bytes_data=dumps_frame_bytes(data))
+
+    async def _send_frame(self, frame):
+        """
+        Envia um frame no formato do subprotocolo negociado.
+
+        Por padrão o frame segue como JSON em texto. Com MCP-V1-binary, frames grandes (ex.: search_cars
+        com muitos carros) seguem como binário, reaproveitando os bytes já serializados; com
+        MCP-V2-msgpack, todos os frames seguem como binário em msgpack.
+
+        Args:
+            frame: Frame a ser enviado
+
+        """
+        if self.use_msgpack:
+            await self.send(bytes_data=msgpack.packb(frame, default=str))
+            return
+
+        payload = dumps_frame_bytes(frame)
+        if self.use_binary_frames and len(payload) > self.binary_frame_threshold:
+            await self.send(bytes_data=payload)
+        else:
+            await self.send(text_data=payload.decode("utf-8"))
+
+    async def _flush_loop(self):
+        """
+        Envia a fila de saída: um frame sozinho segue como está, vários viram um único mcp_batch.
+
+        Se nem o aviso de erro puder ser enviado, a conexão caiu: o flusher encerra, descarta o que
+        restou na fila (liberando quem espera vaga nela) e os próximos envios seguem direto.
+        """
+        try:
+            while True:
+                batch = [await self._out_queue.get()]
+                while not self._out_queue.empty():
+                    batch.append(self._out_queue.get_nowait())
+
+                frame = batch[0] if len(batch) == 1 else {"type": "mcp_batch", "items": batch}
+                try:
+                    await self._send_frame(frame)
+                except Exception as e:
+                    logger.error(f"Erro ao enviar frames MCP: {e}", exc_info=True)
+                    if not await self._send_batch_errors(batch, e):
+                        return
+        finally:
+            self._drop_pending()
+
+    async def _send_batch_errors(self, batch: list, error: Exception) -> bool:
+        """Avisa o cliente das requisições do lote que ficaram sem resposta; retorna False se o envio falhar."""
+        try:
+            for item in batch:
+                if item.get("request_id"):
+                    await self._send_frame(
+                        self.create_error_response(
+                            f"Erro ao enviar resposta: {error!s}", "SEND_ERROR", item["request_id"]
+                        )
+                    )
+        except Exception as e:
+            logger.error(f"Erro ao enviar aviso de falha MCP, encerrando o envio agrupado: {e}", exc_info=True)
+            return False
+        return True
+
+    def _drop_pending(self):
+        """Descarta os frames ainda na fila de saída, registrando quantos foram perdidos."""
+        dropped = 0
+        while not self._out_queue.empty():
+            self._out_queue.get_nowait()
+            dropped += 1
+        if dropped:
+            logger.warning(f"{dropped} frame(s) MCP descartado(s) sem envio para {self.user}")
 
     def create_error_response(self, error_message, error_code="INTERNAL_ERROR", request_id=None):
         """Cria uma resposta de erro padronizada."""
@@ -46,7 +161,7 @@ class MCPCarSocket(AbstractSocket):
             "error": error_message,
             "error_code": error_code,
             "request_id": request_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
 
     def create_mcp_response(self, success=True, data=None, error=None, error_code=None, request_id=None):
@@ -58,13 +173,13 @@ class MCPCarSocket(AbstractSocket):
             "data": data,
             "error": error,
             "error_code": error_code,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
 
     def create_search_entry(self, request_data, response):
         """Cria uma entrada de histórico de busca padronizada."""
         return {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "filters": request_data.get("filters", {}),
             "pagination": request_data.get("pagination", {}),
             "results_count": response.get("data", {}).get("total", 0) if response.get("success") else 0,
@@ -73,12 +188,26 @@ class MCPCarSocket(AbstractSocket):
 
     async def connect(self):
         """Handle WebSocket connection para MCP."""
+        # Aceitar com o primeiro subprotocolo suportado, na ordem de preferência do cliente
+        for protocol in self.scope.get("subprotocols", ()):
+            if protocol in self.protocol_features:
+                features = self.protocol_features[protocol]
+                self.current_protocol = protocol
+                self.use_msgpack = "msgpack" in features
+                self.use_binary_frames = "binary" in features
+                self.use_batching = "batch" in features
+                break
+
         # Usar o método connect do AbstractSocket
         await super().connect()
 
         # Inicializar handler MCP
         self.mcp_handler = CarMCPHandler(user=self.user)
 
+        # Iniciar o envio agrupado dos frames de saída, só para quem o negociou
+        if self.use_batching:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
         # Enviar mensagem de boas-vindas MCP
         welcome_message = {
             "type": "mcp_welcome",
@@ -91,10 +220,11 @@ class MCPCarSocket(AbstractSocket):
                 "get_engines",
                 "get_car_details",
                 "get_filters_options",
+                "batch_execute",
             ],
             "user": str(self.user) if self.user else "anonymous",
             "room": self.room,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
 
         await self.send_json(welcome_message)
@@ -102,10 +232,35 @@ class MCPCarSocket(AbstractSocket):
     async def receive(self, text_data=None, bytes_data=None):
         """Processa mensagens MCP recebidas do cliente."""
         try:
-            if text_data:
+            if bytes_data and self.use_msgpack:
+                try:
+                    message_data = msgpack.unpackb(bytes_data)
+                except (ValueError, msgpack.UnpackException) as e:
+                    error_response = self.create_error_response(f"MessagePack inválido: {e!s}", "INVALID_MSGPACK")
+                    await self.send_json(error_response)
+                    return
+
+                if not isinstance(message_data, dict):
+                    error_response = self.create_error_response(
+                        "MessagePack inválido: a mensagem deve ser um mapa", "INVALID_MSGPACK"
+                    )
+                    await self.send_json(error_response)
+                    return
+
+                if message_data.get("type") == "mcp_request":
+                    await self._handle_mcp_request(message_data)
+
+            elif bytes_data:
+                # Frames binários só são lidos com o subprotocolo MCP-V2-msgpack
+                error_response = self.create_error_response(
+                    "Frames binários exigem o subprotocolo MCP-V2-msgpack", "UNSUPPORTED_FRAME"
+                )
+                await self.send_json(error_response)
+
+            elif text_data:
                 # Parse da mensagem JSON
                 try:
-                    message_data = json.loads(text_data)
+                    message_data = loads_frame(text_data)
                 except json.JSONDecodeError as e:
                     error_response = self.create_error_response(f"JSON inválido: {e!s}", "INVALID_JSON")
                     await self.send_json(error_response)
@@ -132,21 +287,22 @@ class MCPCarSocket(AbstractSocket):
 
             # Adicionar request_id se não fornecido
             if not request_id:
-                request_id = f"req_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+                request_id = new_request_id()
 
             # Construir estrutura completa para o serializer
             full_request_data = {"request_id": request_id, "data": request_data}
 
-            # Processar requisição via handler MCP
-            response = await self.mcp_handler.handle_request(full_request_data)
+            # Processar requisição via handler MCP (em blocos, se o cliente pediu streaming da busca)
+            if request_data.get("stream") and request_data.get("action") == "search_cars":
+                response = await self._stream_search_results(request_id, full_request_data)
+            else:
+                response = await self.mcp_handler.handle_request(full_request_data)
+                await self.send_json(response)
 
             # Adicionar ao histórico de buscas se for uma busca
             if request_data.get("action") == "search_cars":
                 self._add_to_search_history(request_data, response)
 
-            # Enviar resposta MCP
-            await self.send_json(response)
-
         except Exception as e:
             logger.error(f"Erro ao processar requisição MCP: {e}", exc_info=True)
             error_response = self.create_error_response(
@@ -154,15 +310,52 @@ class MCPCarSocket(AbstractSocket):
             )
             await self.send_json(error_response)
 
+    async def _stream_search_results(self, request_id, full_request_data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Executa search_cars enviando os resultados em blocos, seguidos de um marcador de fim.
+
+        Cada bloco vai em um frame mcp_search_chunk assim que o handler lê e serializa a fatia
+        correspondente; o mcp_search_end final traz o total e a paginação. Os frames seguem pelo
+        send_json, na mesma ordem das demais saídas da conexão.
+
+        Args:
+            request_id: ID da requisição, repetido em todos os frames
+            full_request_data: Requisição completa repassada ao handler
+
+        Returns:
+            Resposta de search_cars (sem "results"), usada no histórico de buscas
+
+        """
+
+        async def send_chunk(chunk: list) -> None:
+            await self.send_json({"type": "mcp_search_chunk", "request_id": request_id, "chunk": chunk})
+
+        response = await self.mcp_handler.handle_request(full_request_data, on_chunk=send_chunk)
+        if not response.get("success"):
+            await self.send_json(response)
+            return response
+
+        search_data = response["data"]
+        await self.send_json(
+            {
+                "type": "mcp_search_end",
+                "request_id": request_id,
+                "total": search_data["total"],
+                "page": search_data["page"],
+                "page_size": search_data["page_size"],
+                "total_pages": search_data["total_pages"],
+                "timestamp": now_iso(),
+            }
+        )
+        return response
+
     def _add_to_search_history(self, request_data: dict[str, Any], response):
         """Adiciona busca ao histórico da sessão."""
         try:
             search_entry = self.create_search_entry(request_data, response)
 
-            # Manter apenas os últimos 50 registros
+            # O deque descarta sozinho o registro mais antigo além dos últimos 50
             self.search_history.append(search_entry)
-            if len(self.search_history) > 50:
-                self.search_history = self.search_history[-50:]
 
         except Exception as e:
             logger.warning(f"Erro ao adicionar ao histórico de buscas: {e}")
@@ -172,7 +365,7 @@ class MCPCarSocket(AbstractSocket):
         history_response = self.create_mcp_response(
             data={
                 "action": "get_search_history",
-                "history": self.search_history,
+                "history": list(self.search_history),
                 "total_searches": len(self.search_history),
             }
         )
@@ -180,38 +373,68 @@ class MCPCarSocket(AbstractSocket):
 
     async def clear_search_history(self):
         """Limpa o histórico de buscas da sessão."""
-        self.search_history = []
+        self.search_history.clear()
         clear_response = self.create_mcp_response(
             data={"action": "clear_search_history", "message": "Histórico de buscas limpo"}
         )
         await self.send_json(clear_response)
 
     async def send_messages(self, dt: dict):
-        """Envia mensagens para o cliente (compatibilidade com AbstractSocket)."""
+        """
+        Envia mensagens para o cliente (compatibilidade com AbstractSocket).
+
+        O campo "data" já chega como JSON serializado por SocketsLayout.get_layout; ele é encaixado
+        no envelope como está, em vez de ser decodificado e serializado de novo a cada destinatário.
+
+        Args:
+            dt: Evento send_messages recebido do channel layer
+
+        """
         data = dt.copy()
-        if "data" in data and isinstance(data["data"], str):
-            data["data"] = json.loads(data["data"])
         data.pop("type", None)
-        await self.send_json(data)
+        if not isinstance(data.get("data"), str):
+            await self.send_json(data)
+            return
+
+        if self.use_msgpack:
+            # Cliente MessagePack: o JSON precisa ser decodificado para ser reempacotado
+            data["data"] = loads_frame(data["data"])
+            await self.send_json(data)
+            return
+
+        raw_data = data.pop("data")
+        await self.send(text_data=splice_frame(data, raw_data))
 
     async def broadcast_to_room(self, message):
-        """Envia uma mensagem para todos os usuários na sala."""
+        """
+        Envia uma mensagem para todos os usuários na sala.
+
+        O evento leva o JSON já serializado uma única vez: clientes JSON recebem o texto como está,
+        e só os clientes MessagePack o decodificam para reempacotar.
+
+        Args:
+            message: Conteúdo a ser difundido na sala
+
+        """
         broadcast_message = {
             "type": "broadcast",
             "message": message,
             "user": str(self.user) if self.user else "anonymous",
             "room": self.room,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
         }
 
         await self.channel_layer.group_send(
-            self.room, {"type": "group_message", "data": json.dumps(broadcast_message, default=str)}
+            self.room, {"type": "group_message", "data": dumps_frame(broadcast_message)}
         )
 
     async def group_message(self, event):
         """Handle group messages (broadcast)."""
         message = event["data"]
-        await self.send(text_data=message)
+        if self.use_msgpack:
+            await self.send_json(loads_frame(message))
+        else:
+            await self.send(text_data=message)
 
     async def disconnect(self, code):
         """Handle WebSocket disconnection."""
@@ -219,5 +442,13 @@ class MCPCarSocket(AbstractSocket):
         total_searches = len(self.search_history)
         logger.debug(f"Usuário MCP {self.user} desconectado da sala {self.room}. Total de buscas: {total_searches}")
 
+        # Encerrar o flusher e esvaziar a fila: com a conexão fechada, os frames pendentes são descartados
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await self._flusher
+            self._flusher = None
+        self._drop_pending()
+
         # Usar o método disconnect do AbstractSocket
         await super().disconnect(code)
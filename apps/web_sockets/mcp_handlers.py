@@ -6,22 +6,32 @@ integrando com a API REST existente para fornecer funcionalidades de busca
 de carros em tempo real.
 """
 
+import asyncio
 import logging
-from datetime import datetime
+from collections.abc import Awaitable, Callable
+from functools import cached_property
 from typing import Any
 
 from asgiref.sync import sync_to_async
-from django.db.models import Count, Max, Min, Q
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connection
+from django.db.models import Count, Max, Min, Q, Window
 from django.test import RequestFactory
 from rest_framework import serializers
 from rest_framework.request import Request
 
 from apps.cars.models import Brand, Car, Color, Engine
 from apps.cars.schemas import CarDetailSchema
-from apps.web_sockets.mcp_rest_integration import MCPRestIntegration
+from apps.web_sockets.mcp_rest_integration import (
+    MCPRestIntegration,
+    aget_cached_catalog,
+    aset_cached_catalog,
+)
 from apps.web_sockets.serializers import (
     MCPRequestSerializer,
     SearchCarsRequestSerializer,
+    new_request_id,
+    now_iso,
 )
 from drf_base_apps.utils import get_user_model
 
@@ -37,7 +47,7 @@ def create_mcp_response(success=True, data=None, error=None, request_id=None):
         "request_id": request_id,
         "data": data or {},
         "error": error,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
     }
 
 
@@ -50,10 +60,107 @@ def create_mcp_error(error_message, error_code="INTERNAL_ERROR", request_id=None
         "data": {},
         "error": error_message,
         "error_code": error_code,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
     }
 
 
+# Relações lidas pelo CarDetailSchema (aninhados e auditoria), carregadas no mesmo SELECT
+CAR_DETAIL_RELATED = ("car_name__brand", "car_model", "color", "engine", "create_user", "update_user")
+
+
+# Filtros simples de search_cars: (chave do filtro, lookup na queryset)
+_FILTER_LOOKUPS = (
+    # Filtros de relacionamento por ID
+    ("brand_id", "car_name__brand_id"),
+    ("color_id", "color_id"),
+    ("engine_id", "engine_id"),
+    ("car_model_id", "car_model_id"),
+    ("car_name_id", "car_name_id"),
+    # Filtros de relacionamento por nome (busca parcial)
+    ("brand_name", "car_name__brand__name__icontains"),
+    ("color_name", "color__name__icontains"),
+    ("engine_name", "engine__name__icontains"),
+    ("car_model_name", "car_model__name__icontains"),
+    ("car_name", "car_name__name__icontains"),
+    # Filtros de escolha
+    ("fuel_type", "fuel_type"),
+    ("transmission", "transmission"),
+)
+
+# Filtros numéricos com range: <campo>_min -> <campo>__gte e <campo>_max -> <campo>__lte
+_RANGE_LOOKUPS = tuple(
+    (f"{field}_{suffix}", f"{field}__{lookup}")
+    for field in ("year_manufacture", "year_model", "mileage", "doors", "price")
+    for suffix, lookup in (("min", "gte"), ("max", "lte"))
+)
+
+# Campos da busca textual geral (combinados com OR); no PostgreSQL cada um tem índice trigram (cars 0002)
+_SEARCH_FIELDS = (
+    "car_name__name__icontains",
+    "car_name__brand__name__icontains",
+    "car_model__name__icontains",
+    "color__name__icontains",
+    "engine__name__icontains",
+)
+
+
+# Campos do MCPRequestSerializer que o validate() copia do bloco "data" para o nível principal
+_REQUEST_FIELDS = ("action", "request_id", "data")
+
+
+def _is_clean_text(value: Any, max_length: int | None = None) -> bool:
+    """Indica se o valor é um texto que o CharField do DRF aceitaria sem alterar (não vazio, sem bordas)."""
+    return (
+        isinstance(value, str)
+        and value != ""
+        and value == value.strip()
+        and (max_length is None or len(value) <= max_length)
+    )
+
+
+def fast_validate_request(request_data: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Valida requisições MCP simples (todas as ações exceto search_cars) sem instanciar o serializer DRF.
+
+    Só aceita o formato bem comportado, para o qual o resultado é idêntico ao validated_data do
+    MCPRequestSerializer; qualquer outro caso retorna None e deve seguir pelo serializer, que gera
+    as mensagens de erro.
+
+    Args:
+        request_data: Requisição completa ({"request_id": ..., "data": {...}})
+
+    Returns:
+        Dados validados, ou None se a requisição precisa da validação completa do DRF
+
+    """
+    if not request_data.keys() <= set(_REQUEST_FIELDS):
+        return None
+
+    validated: dict[str, Any] = {}
+    if "action" in request_data:
+        if not _is_clean_text(request_data["action"], max_length=100):
+            return None
+        validated["action"] = request_data["action"]
+
+    if "request_id" in request_data:
+        request_id = request_data["request_id"]
+        if request_id is not None and not _is_clean_text(request_id):
+            return None
+        validated["request_id"] = request_id
+
+    data = request_data.get("data", {})
+    if not isinstance(data, dict) or not all(isinstance(key, str) for key in data):
+        return None
+    validated["data"] = data
+
+    # Mesmo achatamento do MCPRequestSerializer.validate(): campos conhecidos dentro de "data" sobem de nível
+    for key in _REQUEST_FIELDS:
+        if key in data:
+            validated[key] = data[key]
+
+    return validated
+
+
 class MCPBrandSerializer(serializers.ModelSerializer):
     """Serializer customizado para marcas com contagem de carros."""
 
@@ -93,11 +200,24 @@ class MCPEngineSerializer(serializers.ModelSerializer):
 class MCPHandler:
     """Classe base para handlers MCP."""
 
+    # Ação MCP -> nome do método que a trata; cada subclasse declara as ações que suporta
+    _HANDLERS: dict[str, str] = {}
+
+    # Sem estado por requisição: uma única factory compartilhada por todos os handlers
+    factory = RequestFactory()
+
+    # Limites de batch_execute: sub-requisições por lote e quantas são processadas ao mesmo tempo
+    batch_max_requests = 20
+    batch_max_concurrent = 8
+
     def __init__(self, user=None):
         """Inicializa o handler com o usuário atual."""
         self.user = user
-        self.factory = RequestFactory()
-        self.rest_integration = MCPRestIntegration(user=user)
+
+    @cached_property
+    def rest_integration(self) -> MCPRestIntegration:
+        """Integração com a API REST, criada só quando algum handler a usa de fato."""
+        return MCPRestIntegration(user=self.user)
 
     def create_drf_request(self, method: str = "GET", data: dict | None = None, **kwargs) -> Request:
         """Cria uma requisição DRF para integração com as views existentes."""
@@ -106,50 +226,65 @@ class MCPHandler:
         request.data = data or {}
         return Request(request)
 
-    async def handle_request(self, request_data: dict[str, Any]) -> dict[str, Any]:
-        """Processa uma requisição MCP e retorna a resposta apropriada."""
+    async def handle_request(
+        self, request_data: dict[str, Any], on_chunk: Callable[[list], Awaitable[None]] | None = None
+    ) -> dict[str, Any]:
+        """
+        Processa uma requisição MCP e retorna a resposta apropriada.
+
+        Args:
+            request_data: Requisição MCP ({"request_id": ..., "data": {"action": ..., ...}})
+            on_chunk: Em search_cars, recebe os resultados em blocos à medida que são lidos do banco;
+                a resposta final então vem sem "results"
+
+        """
         try:
             # Determinar qual serializer usar baseado na ação
-            action = request_data.get("data", {}).get("action")
-
-            if action == "search_cars":
-                serializer = SearchCarsRequestSerializer(data=request_data.get("data", {}))
-            else:
-                serializer = MCPRequestSerializer(data=request_data)
+            data = request_data.get("data", {})
+            action = data.get("action")
+
+            # Argumentos lazy: a requisição só é formatada se o nível DEBUG estiver ativo
+            logger.debug("MCP request: %s", request_data)
+
+            # Ações simples bem formadas dispensam o serializer DRF; o resto passa pela validação completa
+            validated_data = None if action == "search_cars" else fast_validate_request(request_data)
+            if validated_data is None:
+                if action == "search_cars":
+                    # O serializer de busca valida só o bloco "data": o request_id externo vai junto para a resposta
+                    if request_data.get("request_id"):
+                        data = {**data, "request_id": request_data["request_id"]}
+                    serializer = SearchCarsRequestSerializer(data=data)
+                else:
+                    serializer = MCPRequestSerializer(data=request_data)
 
-            logger.debug(f"MCP request: {request_data}")
+                # Validação DRF fora do event loop, na thread padrão do sync_to_async (thread_sensitive=True):
+                # validators e campos customizados podem consultar o banco e precisam da conexão dessa thread
+                if not await sync_to_async(serializer.is_valid)():
+                    logger.error(f"Erro de validação: {serializer.errors}")
+                    return create_mcp_error(
+                        error_message=f"Dados de requisição inválidos: {serializer.errors}",
+                        error_code="INVALID_REQUEST",
+                        request_id=request_data.get("request_id"),
+                    )
 
-            if not serializer.is_valid():
-                logger.error(f"Erro de validação: {serializer.errors}")
-                return create_mcp_error(
-                    error_message=f"Dados de requisição inválidos: {serializer.errors}",
-                    error_code="INVALID_REQUEST",
-                    request_id=request_data.get("request_id"),
-                )
+                validated_data = serializer.validated_data
 
-            validated_data = serializer.validated_data
             request_id = validated_data.get("request_id")
 
-            logger.debug(f"MCP request validated_data: {validated_data}")
+            logger.debug("MCP request validated_data: %s", validated_data)
 
-            # Roteamento baseado na ação
-            handler_map = {
-                "search_cars": self.handle_search_cars,
-                "get_brands": self.handle_get_brands,
-                "get_colors": self.handle_get_colors,
-                "get_engines": self.handle_get_engines,
-                "get_car_details": self.handle_get_car_details,
-                "get_filters_options": self.handle_get_filters_options,
-            }
-
-            handler = handler_map.get(action)
-            if not handler:
+            # Roteamento baseado na ação (tabela da classe, montada uma única vez)
+            method_name = self._HANDLERS.get(action)
+            if method_name is None:
                 return create_mcp_error(
                     error_message=f"Ação '{action}' não suportada",
                     error_code="UNSUPPORTED_ACTION",
                     request_id=request_id,
                 )
 
+            handler = getattr(self, method_name)
+            if on_chunk is not None and action == "search_cars":
+                return await handler(validated_data, on_chunk=on_chunk)
             return await handler(validated_data)
 
         except Exception as e:
@@ -160,12 +295,90 @@ class MCPHandler:
                 request_id=request_data.get("request_id"),
             )
 
+    async def handle_batch_execute(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Executa várias ações MCP em uma única requisição (um round-trip WebSocket).
+
+        Cada item de data["requests"] tem o formato do bloco "data" de uma requisição MCP
+        ({"action": ..., ...}) e passa pelo handle_request normal, com validação e roteamento próprios.
+
+        Args:
+            validated_data: Dados validados; data["requests"] traz a lista de sub-requisições e
+                data["stop_on_error"] interrompe o lote na primeira falha (executando em sequência)
+
+        Returns:
+            Resposta MCP com data["results"] na mesma ordem das sub-requisições
+
+        """
+        # Sem request_id, gera um para que os IDs das sub-requisições ("<id>:<índice>") continuem únicos
+        request_id = validated_data.get("request_id") or new_request_id()
+        data = validated_data.get("data", {})
+        sub_requests = data.get("requests")
+
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return create_mcp_error(
+                error_message="Campo 'requests' deve ser uma lista não vazia",
+                error_code="INVALID_BATCH",
+                request_id=request_id,
+            )
+        if len(sub_requests) > self.batch_max_requests:
+            return create_mcp_error(
+                error_message=f"Lote excede o limite de {self.batch_max_requests} requisições",
+                error_code="BATCH_TOO_LARGE",
+                request_id=request_id,
+            )
+
+        semaphore = asyncio.Semaphore(self.batch_max_concurrent)
+
+        async def run(index: int, sub_data: Any) -> dict[str, Any]:
+            sub_request_id = f"{request_id}:{index}"
+            if not isinstance(sub_data, dict) or sub_data.get("action") == "batch_execute":
+                return create_mcp_error(
+                    error_message="Sub-requisição inválida", error_code="INVALID_BATCH_ITEM", request_id=sub_request_id
+                )
+            # Um request_id próprio dentro do item substituiria o "<id>:<índice>" na validação: é descartado
+            sub_data = {key: value for key, value in sub_data.items() if key != "request_id"}
+            async with semaphore:
+                return await self.handle_request({"request_id": sub_request_id, "data": sub_data})
+
+        if data.get("stop_on_error"):
+            results = []
+            for index, sub_data in enumerate(sub_requests):
+                result = await run(index, sub_data)
+                results.append(result)
+                if not result.get("success"):
+                    break
+        else:
+            results = await asyncio.gather(*(run(index, sub_data) for index, sub_data in enumerate(sub_requests)))
+
+        return create_mcp_response(success=True, data={"results": results}, request_id=request_id)
+
 
 class CarMCPHandler(MCPHandler):
     """Handler específico para operações de carros via MCP."""
 
-    async def handle_search_cars(self, validated_data: dict[str, Any]) -> dict[str, Any]:
-        """Handle para busca de carros com filtros."""
+    _HANDLERS = {
+        "search_cars": "handle_search_cars",
+        "get_brands": "handle_get_brands",
+        "get_colors": "handle_get_colors",
+        "get_engines": "handle_get_engines",
+        "get_car_details": "handle_get_car_details",
+        "get_filters_options": "handle_get_filters_options",
+        "batch_execute": "handle_batch_execute",
+    }
+
+    # Carros lidos e serializados por vez quando search_cars é enviado em blocos
+    search_chunk_size = 25
+
+    async def handle_search_cars(
+        self, validated_data: dict[str, Any], on_chunk: Callable[[list], Awaitable[None]] | None = None
+    ) -> dict[str, Any]:
+        """
+        Handle para busca de carros com filtros.
+
+        Com on_chunk, a página é lida do banco em fatias de search_chunk_size e cada fatia é serializada
+        e entregue antes da próxima ser consultada; a resposta então traz só o total e a paginação.
+        """
         try:
             # Obter dados diretamente do serializer validado
             request_id = validated_data.get("request_id")
@@ -179,37 +392,54 @@ class CarMCPHandler(MCPHandler):
             ordering = validated_data.get("ordering", "-created_at")
 
             # Construir query
-            queryset = Car.objects.select_related("car_name__brand", "car_model", "color", "engine").all()
+            queryset = Car.objects.select_related(*CAR_DETAIL_RELATED).all()
 
             # Aplicar filtros
             queryset = await self._apply_filters(queryset, filters)
 
-            # Contar total antes da paginação
-            total = await sync_to_async(queryset.count)()
-
             # Aplicar ordenação
             if ordering:
                 queryset = queryset.order_by(ordering)
 
+            # Total via COUNT(*) OVER (): calculado antes do LIMIT, vem junto com a página na mesma query
+            queryset = queryset.annotate(total_count=Window(expression=Count("id")))
+
             # Aplicar paginação
             start = (page - 1) * page_size
             end = start + page_size
-            cars = await sync_to_async(list)(queryset[start:end])
-
-            # Serializar resultados usando o serializer do Django
-            serializer = CarDetailSchema(cars, many=True)
-            car_results = serializer.data
+            total = None
+            if on_chunk is None:
+                cars = await sync_to_async(list)(queryset[start:end])
+                if cars:
+                    total = cars[0].total_count
+                car_results = await self._serialize_cars(cars)
+            else:
+                car_results = None
+                for offset in range(start, end, self.search_chunk_size):
+                    cars = await sync_to_async(list)(queryset[offset : min(offset + self.search_chunk_size, end)])
+                    if not cars:
+                        break
+                    if total is None:
+                        total = cars[0].total_count
+                    await on_chunk(await self._serialize_cars(cars))
+                    if len(cars) < self.search_chunk_size:
+                        break
+
+            if total is None:
+                # Página vazia: sem linhas não há total na janela; além da primeira página, conta à parte
+                total = await sync_to_async(queryset.count)() if page > 1 else 0
 
             # Calcular total de páginas
             total_pages = (total + page_size - 1) // page_size
 
             response_data = {
-                "results": car_results,  # Já são dados serializados do Django
                 "total": total,
                 "page": page,
                 "page_size": page_size,
                 "total_pages": total_pages,
             }
+            if car_results is not None:
+                response_data = {"results": car_results, **response_data}
 
             return create_mcp_response(success=True, data=response_data, request_id=request_id)
 
@@ -219,73 +449,35 @@ class CarMCPHandler(MCPHandler):
                 error_message=f"Erro na busca de carros: {e!s}", error_code="SEARCH_ERROR", request_id=request_id
             )
 
+    @staticmethod
+    async def _serialize_cars(cars: list[Car]) -> list:
+        """
+        Serializa carros com o mesmo schema de get_car_details (mesmos campos e formatos).
+
+        Roda em thread porque os campos de auditoria e os schemas aninhados podem consultar o banco.
+        """
+        return await sync_to_async(lambda: CarDetailSchema(cars, many=True).data)()
+
     async def _apply_filters(self, queryset, filters: dict[str, Any]):
         """Aplica filtros à queryset de carros."""
         if not filters:
             return queryset
 
-        # Mapeamento de filtros para campos da queryset
-        filter_mappings = {
-            # Filtros de relacionamento por ID
-            "brand_id": "car_name__brand_id",
-            "color_id": "color_id",
-            "engine_id": "engine_id",
-            "car_model_id": "car_model_id",
-            "car_name_id": "car_name_id",
-            # Filtros de relacionamento por nome (busca parcial)
-            "brand_name": ("car_name__brand__name__icontains",),
-            "color_name": ("color__name__icontains",),
-            "engine_name": ("engine__name__icontains",),
-            "car_model_name": ("car_model__name__icontains",),
-            "car_name": ("car_name__name__icontains",),
-            # Filtros de escolha
-            "fuel_type": "fuel_type",
-            "transmission": "transmission",
-        }
-
-        # Filtros numéricos com range (min/max)
-        range_filters = {
-            "year_manufacture": "year_manufacture",
-            "year_model": "year_model",
-            "mileage": "mileage",
-            "doors": "doors",
-            "price": "price",
-        }
-
-        # Aplicar filtros simples
-        for filter_key, field_path in filter_mappings.items():
-            if filters.get(filter_key):
-                if isinstance(field_path, tuple):
-                    # Filtros com lookup personalizado
-                    queryset = queryset.filter(**{field_path[0]: filters[filter_key]})
-                else:
-                    # Filtros diretos
-                    queryset = queryset.filter(**{field_path: filters[filter_key]})
-
-        # Aplicar filtros de range (min/max)
-        for field_name, db_field in range_filters.items():
-            min_key = f"{field_name}_min"
-            max_key = f"{field_name}_max"
-
-            if min_key in filters and filters[min_key] is not None:
-                queryset = queryset.filter(**{f"{db_field}__gte": filters[min_key]})
+        # Todos os lookups em um único filter(): um clone da queryset em vez de um por filtro
+        # (todas as relações são FKs diretas, então o resultado é o mesmo de filter() encadeados)
+        lookups = {lookup: filters[key] for key, lookup in _FILTER_LOOKUPS if filters.get(key)}
+        for key, lookup in _RANGE_LOOKUPS:
+            if filters.get(key) is not None:
+                lookups[lookup] = filters[key]
 
-            if max_key in filters and filters[max_key] is not None:
-                queryset = queryset.filter(**{f"{db_field}__lte": filters[max_key]})
+        if lookups:
+            queryset = queryset.filter(**lookups)
 
         # Busca textual geral
         if filters.get("search"):
             search_term = filters["search"]
-            search_fields = [
-                "car_name__name__icontains",
-                "car_name__brand__name__icontains",
-                "car_model__name__icontains",
-                "color__name__icontains",
-                "engine__name__icontains",
-            ]
-
             search_q = Q()
-            for field in search_fields:
+            for field in _SEARCH_FIELDS:
                 search_q |= Q(**{field: search_term})
 
             queryset = queryset.filter(search_q)
@@ -297,16 +489,19 @@ class CarMCPHandler(MCPHandler):
         try:
             request_id = validated_data.get("request_id")
 
-            # Obter marcas com contagem de carros
-            brands_data = await sync_to_async(list)(
-                Brand.objects.annotate(count=Count("car_names__cars", distinct=True))
-                .filter(count__gt=0)
-                .order_by("name")
-            )
+            brands_serialized = await aget_cached_catalog("get_brands")
+            if brands_serialized is None:
+                # Obter marcas com contagem de carros
+                brands_data = await sync_to_async(list)(
+                    Brand.objects.annotate(count=Count("car_names__cars", distinct=True))
+                    .filter(count__gt=0)
+                    .order_by("name")
+                )
 
-            # Usar serializer customizado para MCP
-            serializer = MCPBrandSerializer(brands_data, many=True)
-            brands_serialized = serializer.data
+                # Usar serializer customizado para MCP
+                serializer = MCPBrandSerializer(brands_data, many=True)
+                brands_serialized = serializer.data
+                await aset_cached_catalog("get_brands", brands_serialized)
 
             return create_mcp_response(success=True, data={"brands": brands_serialized}, request_id=request_id)
 
@@ -321,14 +516,17 @@ class CarMCPHandler(MCPHandler):
         try:
             request_id = validated_data.get("request_id")
 
-            # Obter cores com contagem de carros
-            colors_data = await sync_to_async(list)(
-                Color.objects.annotate(count=Count("cars", distinct=True)).filter(count__gt=0).order_by("name")
-            )
+            colors_serialized = await aget_cached_catalog("get_colors")
+            if colors_serialized is None:
+                # Obter cores com contagem de carros
+                colors_data = await sync_to_async(list)(
+                    Color.objects.annotate(count=Count("cars", distinct=True)).filter(count__gt=0).order_by("name")
+                )
 
-            # Usar serializer customizado para MCP
-            serializer = MCPColorSerializer(colors_data, many=True)
-            colors_serialized = serializer.data
+                # Usar serializer customizado para MCP
+                serializer = MCPColorSerializer(colors_data, many=True)
+                colors_serialized = serializer.data
+                await aset_cached_catalog("get_colors", colors_serialized)
 
             return create_mcp_response(success=True, data={"colors": colors_serialized}, request_id=request_id)
 
@@ -343,14 +541,17 @@ class CarMCPHandler(MCPHandler):
         try:
             request_id = validated_data.get("request_id")
 
-            # Obter motores com contagem de carros
-            engines_data = await sync_to_async(list)(
-                Engine.objects.annotate(count=Count("cars", distinct=True)).filter(count__gt=0).order_by("name")
-            )
+            engines_serialized = await aget_cached_catalog("get_engines")
+            if engines_serialized is None:
+                # Obter motores com contagem de carros
+                engines_data = await sync_to_async(list)(
+                    Engine.objects.annotate(count=Count("cars", distinct=True)).filter(count__gt=0).order_by("name")
+                )
 
-            # Usar serializer customizado para MCP
-            serializer = MCPEngineSerializer(engines_data, many=True)
-            engines_serialized = serializer.data
+                # Usar serializer customizado para MCP
+                serializer = MCPEngineSerializer(engines_data, many=True)
+                engines_serialized = serializer.data
+                await aset_cached_catalog("get_engines", engines_serialized)
 
             return create_mcp_response(success=True, data={"engines": engines_serialized}, request_id=request_id)
 
@@ -372,7 +573,7 @@ class CarMCPHandler(MCPHandler):
 
             try:
                 car = await sync_to_async(
-                    Car.objects.select_related("car_name__brand", "car_model", "color", "engine").get
+                    Car.objects.select_related(*CAR_DETAIL_RELATED).get
                 )(id=car_id)
             except Car.DoesNotExist:
                 return create_mcp_error(
@@ -395,56 +596,73 @@ class CarMCPHandler(MCPHandler):
                 request_id=request_id,
             )
 
-    async def handle_get_filters_options(self, validated_data: dict[str, Any]) -> dict[str, Any]:
-        """Handle para obter opções de filtros disponíveis."""
-        try:
-            request_id = validated_data.get("request_id")
+    @staticmethod
+    def _get_filters_stats() -> dict[str, Any]:
+        """
+        Obtém as faixas e valores distintos usados nas opções de filtros.
+
+        Todas as faixas (min/max) saem de um único aggregate; no PostgreSQL os tipos de
+        combustível e de transmissão entram no mesmo aggregate via ArrayAgg, nos demais
+        bancos são obtidos com um values_list distinct cada.
+
+        Returns:
+            Dicionário com as faixas e as listas fuel_types/transmissions
+
+        """
+        aggregates = {
+            "min_year_manufacture": Min("year_manufacture"),
+            "max_year_manufacture": Max("year_manufacture"),
+            "min_year_model": Min("year_model"),
+            "max_year_model": Max("year_model"),
+            "min_price": Min("price"),
+            "max_price": Max("price"),
+            "min_mileage": Min("mileage"),
+            "max_mileage": Max("mileage"),
+            "min_doors": Min("doors"),
+            "max_doors": Max("doors"),
+        }
+        if connection.vendor == "postgresql":
+            aggregates["fuel_types"] = ArrayAgg("fuel_type", distinct=True, order_by="fuel_type")
+            aggregates["transmissions"] = ArrayAgg("transmission", distinct=True, order_by="transmission")
 
-            # Obter tipos de combustível únicos
-            fuel_types = await sync_to_async(list)(
-                Car.objects.values_list("fuel_type", flat=True).distinct().order_by("fuel_type")
-            )
+        stats = Car.objects.aggregate(**aggregates)
 
-            # Obter tipos de transmissão únicos
-            transmissions = await sync_to_async(list)(
+        if "fuel_types" not in stats:
+            stats["fuel_types"] = list(Car.objects.values_list("fuel_type", flat=True).distinct().order_by("fuel_type"))
+            stats["transmissions"] = list(
                 Car.objects.values_list("transmission", flat=True).distinct().order_by("transmission")
             )
 
-            # Obter faixas de anos
-            year_stats = await sync_to_async(Car.objects.aggregate)(
-                min_year_manufacture=Min("year_manufacture"),
-                max_year_manufacture=Max("year_manufacture"),
-                min_year_model=Min("year_model"),
-                max_year_model=Max("year_model"),
-            )
-
-            # Obter faixas de preço
-            price_stats = await sync_to_async(Car.objects.aggregate)(min_price=Min("price"), max_price=Max("price"))
+        return stats
 
-            # Obter faixas de quilometragem
-            mileage_stats = await sync_to_async(Car.objects.aggregate)(
-                min_mileage=Min("mileage"), max_mileage=Max("mileage")
-            )
+    async def handle_get_filters_options(self, validated_data: dict[str, Any]) -> dict[str, Any]:
+        """Handle para obter opções de filtros disponíveis."""
+        try:
+            request_id = validated_data.get("request_id")
 
-            # Obter faixas de portas
-            doors_stats = await sync_to_async(Car.objects.aggregate)(min_doors=Min("doors"), max_doors=Max("doors"))
-
-            filters_options = {
-                "fuel_types": list(fuel_types),
-                "transmissions": list(transmissions),
-                "year_range": {
-                    "min_manufacture": year_stats["min_year_manufacture"] or 1900,
-                    "max_manufacture": year_stats["max_year_manufacture"] or 9999,
-                    "min_model": year_stats["min_year_model"] or 1900,
-                    "max_model": year_stats["max_year_model"] or 9999,
-                },
-                "price_range": {
-                    "min": float(price_stats["min_price"] or 0),
-                    "max": float(price_stats["max_price"] or 0),
-                },
-                "mileage_range": {"min": mileage_stats["min_mileage"] or 0, "max": mileage_stats["max_mileage"] or 0},
-                "doors_range": {"min": doors_stats["min_doors"] or 2, "max": doors_stats["max_doors"] or 8},
-            }
+            filters_options = await aget_cached_catalog("get_filters_options")
+            if filters_options is None:
+                # Um único salto para a thread de banco: sync_to_async é thread_sensitive por padrão, então
+                # um asyncio.gather de várias queries ainda rodaria uma por vez na mesma thread
+                stats = await sync_to_async(self._get_filters_stats)()
+
+                filters_options = {
+                    "fuel_types": list(stats["fuel_types"] or []),
+                    "transmissions": list(stats["transmissions"] or []),
+                    "year_range": {
+                        "min_manufacture": stats["min_year_manufacture"] or 1900,
+                        "max_manufacture": stats["max_year_manufacture"] or 9999,
+                        "min_model": stats["min_year_model"] or 1900,
+                        "max_model": stats["max_year_model"] or 9999,
+                    },
+                    "price_range": {
+                        "min": float(stats["min_price"] or 0),
+                        "max": float(stats["max_price"] or 0),
+                    },
+                    "mileage_range": {"min": stats["min_mileage"] or 0, "max": stats["max_mileage"] or 0},
+                    "doors_range": {"min": stats["min_doors"] or 2, "max": stats["max_doors"] or 8},
+                }
+                await aset_cached_catalog("get_filters_options", filters_options)
 
             return create_mcp_response(success=True, data=filters_options, request_id=request_id)
 
@@ -6,13 +6,19 @@ com as APIs REST existentes, mantendo compatibilidade e reutilizando
 validações e permissões.
 """
 
+import copy
 import logging
+import re
 from typing import Any, Optional
+from urllib.parse import urlencode
 from uuid import UUID
 
+from django.core.cache import cache
+from django.http import QueryDict
 from django.test import RequestFactory
 from rest_framework.request import Request
 
+from apps.cars.models import Brand, Car, CarModel, CarName, Color, Engine
 from apps.cars.views import (
     BrandApi,
     CarApi,
@@ -30,6 +36,118 @@ from apps.web_sockets.serializers import (
 logger = logging.getLogger(__name__)
 
 
+# Dados de catálogo (marcas, cores, motores, modelos, nomes, opções de filtros) mudam raramente: ficam no cache do
+# Django (compartilhado entre workers quando o backend é o Redis), chaveados pela ação. Os signals limpam as chaves
+# em save/delete; bulk_create e QuerySet.update não disparam signals, então após eles o catálogo pode ficar
+# desatualizado por até CATALOG_CACHE_TTL segundos
+CATALOG_CACHE_TTL = 60
+CATALOG_CACHE_PREFIX = "mcp_catalog:"
+CATALOG_CACHE_KEYS = (
+    "get_brands",
+    "get_colors",
+    "get_engines",
+    "get_filters_options",
+    "rest:get_brands",
+    "rest:get_colors",
+    "rest:get_engines",
+    "rest:get_car_models",
+    "rest:get_car_names",
+)
+
+
+def get_cached_catalog(key: str) -> Any | None:
+    """Retorna uma cópia dos dados de catálogo em cache para a ação, ou None se ausentes ou expirados."""
+    # O cache do Django guarda os dados serializados: cada leitura devolve um objeto novo, que o chamador pode alterar
+    return cache.get(f"{CATALOG_CACHE_PREFIX}{key}")
+
+
+def set_cached_catalog(key: str, data: Any) -> None:
+    """Guarda os dados de catálogo da ação (sem request_id, que é por requisição)."""
+    cache.set(f"{CATALOG_CACHE_PREFIX}{key}", data, CATALOG_CACHE_TTL)
+
+
+async def aget_cached_catalog(key: str) -> Any | None:
+    """Versão assíncrona de get_cached_catalog, para os handlers MCP."""
+    return await cache.aget(f"{CATALOG_CACHE_PREFIX}{key}")
+
+
+async def aset_cached_catalog(key: str, data: Any) -> None:
+    """Versão assíncrona de set_cached_catalog, para os handlers MCP."""
+    await cache.aset(f"{CATALOG_CACHE_PREFIX}{key}", data, CATALOG_CACHE_TTL)
+
+
+# Models que alimentam os catálogos e as opções de filtros; WebSocketsConfig.ready() conecta seus signals
+CATALOG_MODELS = (Brand, CarModel, CarName, Color, Engine, Car)
+
+
+def clear_catalog_cache(*args, **kwargs) -> None:
+    """Limpa as chaves de catálogo; receiver de post_save/post_delete dos CATALOG_MODELS."""
+    # Só as chaves de catálogo: o cache é compartilhado com o resto da aplicação, então nada de cache.clear()
+    cache.delete_many([f"{CATALOG_CACHE_PREFIX}{key}" for key in CATALOG_CACHE_KEYS])
+
+
+# Ações MCP aceitas por validate_mcp_request
+_SUPPORTED_ACTIONS = frozenset(
+    {
+        "search_cars",
+        "get_brands",
+        "get_colors",
+        "get_engines",
+        "get_car_details",
+        "get_filters_options",
+        "batch_execute",
+    }
+)
+
+# Forma canônica 8-4-4-4-12 de um UUID; outras formas aceitas por UUID() seguem pelo parse completo
+_UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+
+# Tabelas de _build_query_params, montadas uma única vez no carregamento do módulo
+
+# Filtros de relacionamento: (campo do filtro, parâmetro de query, transformação)
+_RELATIONSHIP_QUERY_PARAMS = (
+    ("brand_id", "car_name__brand_id", str),
+    ("brand_name", "car_name__brand__name__icontains", str),
+    ("color_id", "color_id", str),
+    ("color_name", "color__name__icontains", str),
+    ("engine_id", "engine_id", str),
+    ("engine_name", "engine__name__icontains", str),
+    ("car_model_id", "car_model_id", str),
+    ("car_model_name", "car_model__name__icontains", str),
+    ("car_name_id", "car_name_id", str),
+    ("car_name", "car_name__name__icontains", str),
+)
+
+# Filtros de escolha: (campo do filtro, parâmetro de query)
+_CHOICE_QUERY_PARAMS = (
+    ("fuel_type", "fuel_type"),
+    ("transmission", "transmission"),
+)
+
+# Filtros de range: (campo _min, parâmetro __gte, campo _max, parâmetro __lte)
+_RANGE_QUERY_PARAMS = tuple(
+    (f"{field}_min", f"{field}__gte", f"{field}_max", f"{field}__lte")
+    for field in ("year_manufacture", "year_model", "mileage", "doors", "price")
+)
+
+# Índice campo -> (parâmetro de query, transformação, aceita valores falsy), derivado das tabelas acima;
+# permite percorrer só os campos presentes em validated_data em vez de todas as tabelas
+_FILTER_QUERY_INDEX = {
+    **{field: (query_key, transform, False) for field, query_key, transform in _RELATIONSHIP_QUERY_PARAMS},
+    **{field: (query_key, None, False) for field, query_key in _CHOICE_QUERY_PARAMS},
+    **{min_field: (min_key, None, True) for min_field, min_key, _max_field, _max_key in _RANGE_QUERY_PARAMS},
+    **{max_field: (max_key, None, True) for _min_field, _min_key, max_field, max_key in _RANGE_QUERY_PARAMS},
+    "search": ("search", None, False),
+}
+
+# Parâmetros de paginação: (campo da paginação, parâmetro de query)
+_PAGINATION_QUERY_PARAMS = (
+    ("page", "page"),
+    ("page_size", "page_size"),
+    ("ordering", "ordering"),
+)
+
+
 class MCPRestIntegration:
     """
     Classe para integração entre MCP WebSocket e API REST.
@@ -38,18 +156,60 @@ class MCPRestIntegration:
     existentes, mantendo todas as validações, permissões e lógica de negócio.
     """
 
+    # Estado por instância: usuário, protótipo de HttpRequest e views reaproveitadas (sem __dict__ por instância)
+    __slots__ = ("_base_http_request", "_views", "user")
+
+    # Sem estado por requisição: uma única factory compartilhada por todas as integrações
+    factory = RequestFactory()
+
+    # Ação MCP -> nome do método com a validação específica; ações fora da tabela não têm validação extra
+    _VALIDATORS: dict[str, str] = {
+        "search_cars": "_validate_search_cars_request",
+        "get_car_details": "_validate_get_car_details_request",
+    }
+
     def __init__(self, user=None):
         """Inicializa a integração com o usuário atual."""
         self.user = user
-        self.factory = RequestFactory()
+        # Protótipo de HttpRequest criado uma única vez; cada chamada parte de uma cópia rasa dele
+        self._base_http_request = self.factory.request()
+        # View REST por classe, criada na primeira chamada e reaproveitada pela instância (ver _get_view)
+        self._views = {}
 
     def create_drf_request(self, method: str = "GET", data: dict | None = None, **kwargs) -> Request:
         """Cria uma requisição DRF para integração com as views existentes."""
-        request = self.factory.request(**kwargs)
+        # Sem overrides de environ, a cópia do protótipo evita montar o HttpRequest do zero
+        request = self.factory.request(**kwargs) if kwargs else copy.copy(self._base_http_request)
         request.user = self.user
         request.data = data or {}
         return Request(request)
 
+    def create_get_request(self, query_params: dict | None = None):
+        """
+        Cria uma requisição GET interna sem o wrapper DRF Request.
+
+        As chamadas internas só leem query_params, user e data; anexá-los diretamente à cópia do protótipo
+        evita montar parsers, autenticadores e negociador do Request a cada chamada MCP.
+
+        Args:
+            query_params: Parâmetros de query para a requisição
+
+        Returns:
+            HttpRequest com os atributos usados pelas views REST
+
+        """
+        request = copy.copy(self._base_http_request)
+        request.method = "GET"
+        request.user = self.user
+        request.auth = None
+        request.data = {}
+        # QueryDict e QUERY_STRING a partir da mesma string: a paginação do DRF monta os links next/previous
+        # com build_absolute_uri(), que lê a query string do META (o META é copiado, não o do protótipo)
+        query_string = urlencode(query_params or {}, doseq=True)
+        request.META = {**request.META, "QUERY_STRING": query_string}
+        request.query_params = request.GET = QueryDict(query_string)
+        return request
+
     def search_cars_via_rest(self, filters: CarFilterSerializer, pagination: PaginationSerializer) -> dict[str, Any]:
         """
         Executa busca de carros via API REST existente.
@@ -62,10 +222,10 @@ class MCPRestIntegration:
             Dados da resposta da API REST
 
         """
-        # Construir parâmetros de query
-        query_params = self._build_query_params(filters, pagination)
+        # Construir parâmetros de query a partir dos dados já validados
+        query_params = self._build_query_params(filters.validated_data, pagination.validated_data)
 
-        return self._call_rest_api(CarApi, error_context="busca de carros", query_params=query_params)
+        return self._call_get_with_query(CarApi, "busca de carros", query_params)
 
     def get_car_details_via_rest(self, car_id: UUID) -> dict[str, Any]:
         """
@@ -78,7 +238,7 @@ class MCPRestIntegration:
             Dados do carro
 
         """
-        return self._call_rest_api(CarDetailApi, error_context="detalhes do carro", kwargs={"id": car_id})
+        return self._call_get_with_kwargs(CarDetailApi, "detalhes do carro", {"id": car_id})
 
     def _call_rest_api(
         self,
@@ -92,6 +252,8 @@ class MCPRestIntegration:
         """
         Método genérico para chamar APIs REST.
 
+        GETs simples são encaminhados para _call_get, _call_get_with_query ou _call_get_with_kwargs.
+
         Args:
             view_class: Classe da view REST
             method_name: Nome do método da view (padrão: 'get')
@@ -104,13 +266,18 @@ class MCPRestIntegration:
             Dados da resposta ou erro
 
         """
-        try:
-            # Criar requisição para a API REST
-            request = self.create_drf_request(method="GET", data=data)
+        # GETs seguem pelos caminhos especializados abaixo; os demais casos usam o Request DRF completo
+        if method_name == "get" and not data:
+            if not kwargs:
+                if query_params:
+                    return self._call_get_with_query(view_class, error_context, query_params)
+                return self._call_get(view_class, error_context)
+            if not query_params:
+                return self._call_get_with_kwargs(view_class, error_context, kwargs)
 
-            # Adicionar parâmetros de query se fornecidos
-            if query_params:
-                request.query_params = query_params
+        try:
+            environ = {"QUERY_STRING": urlencode(query_params, doseq=True)} if query_params else {}
+            request = self.create_drf_request(method=method_name.upper(), data=data, **environ)
 
             # Adicionar kwargs se fornecidos
             if kwargs:
@@ -119,19 +286,99 @@ class MCPRestIntegration:
             # Instanciar e chamar a view REST
             view = view_class()
             view.setup(request)
+            return self._response_data(getattr(view, method_name)(request, **(kwargs or {})))
 
-            # Executar a view com kwargs se fornecidos
-            response = getattr(view, method_name)(request, **kwargs) if kwargs else getattr(view, method_name)(request)
+        except Exception as e:
+            return self._rest_error(error_context, e)
 
-            # Converter resposta para dict
-            if hasattr(response, "data"):
-                return response.data
-            else:
-                return {"error": "Resposta inválida da API REST"}
+    # Caminhos GET especializados: cada um tem um formato fixo de chamada, sem parâmetros opcionais para testar
 
+    def _call_get(self, view_class, error_context: str) -> dict[str, Any]:
+        """Chama o GET de uma view REST sem query params nem kwargs (catálogos)."""
+        try:
+            request = self.create_get_request()
+            view = self._get_view(view_class)
+            view.setup(request)
+            return self._response_data(view.get(request))
+        except Exception as e:
+            return self._rest_error(error_context, e)
+
+    def _call_get_with_query(self, view_class, error_context: str, query_params: dict[str, Any]) -> dict[str, Any]:
+        """Chama o GET de uma view REST com parâmetros de query (listagens filtradas)."""
+        try:
+            request = self.create_get_request(query_params)
+            view = self._get_view(view_class)
+            view.setup(request)
+            return self._response_data(view.get(request))
         except Exception as e:
-            logger.error(f"Erro na integração REST para {error_context}: {e}", exc_info=True)
-            return {"error": f"Erro ao obter {error_context}: {e!s}"}
+            return self._rest_error(error_context, e)
+
+    def _call_get_with_kwargs(self, view_class, error_context: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Chama o GET de uma view REST com kwargs de URL (detalhes por id)."""
+        try:
+            request = self.create_get_request()
+            request.kwargs = kwargs
+            view = self._get_view(view_class)
+            view.setup(request)
+            return self._response_data(view.get(request, **kwargs))
+        except Exception as e:
+            return self._rest_error(error_context, e)
+
+    def _get_view(self, view_class):
+        """
+        Retorna a instância reaproveitada da view REST, criando-a na primeira chamada.
+
+        O __init__ das views (campos de ordenação, paginação) é o custo dominante de instanciar; o estado por
+        chamada (request, args, kwargs e o paginador) é redefinido por setup() e pela própria paginação. O cache
+        é por instância da integração, que não deve ser usada por threads concorrentes.
+
+        Args:
+            view_class: Classe da view REST
+
+        Returns:
+            Instância da view
+
+        """
+        view = self._views.get(view_class)
+        if view is None:
+            view = self._views[view_class] = view_class()
+        return view
+
+    @staticmethod
+    def _response_data(response) -> dict[str, Any]:
+        """Extrai os dados da resposta REST (respostas sem .data, como JsonResponse, são inválidas aqui)."""
+        try:
+            return response.data
+        except AttributeError:
+            return {"error": "Resposta inválida da API REST"}
+
+    @staticmethod
+    def _rest_error(error_context: str, error: Exception) -> dict[str, Any]:
+        """Registra a falha da chamada REST e monta a resposta de erro."""
+        logger.error(f"Erro na integração REST para {error_context}: {error}", exc_info=True)
+        return {"error": f"Erro ao obter {error_context}: {error!s}"}
+
+    def _call_cached_rest_api(self, cache_key: str, view_class, error_context: str) -> dict[str, Any]:
+        """
+        Chama uma view REST de catálogo reaproveitando o resultado do cache de catálogo.
+
+        Respostas de erro não são guardadas, para que a próxima chamada tente de novo.
+
+        Args:
+            cache_key: Chave do cache de catálogo
+            view_class: Classe da view REST
+            error_context: Contexto para mensagens de erro
+
+        Returns:
+            Dados da resposta ou erro
+
+        """
+        data = get_cached_catalog(cache_key)
+        if data is None:
+            data = self._call_get(view_class, error_context)
+            if "error" not in data:
+                set_cached_catalog(cache_key, data)
+        return data
 
     def get_brands_via_rest(self) -> dict[str, Any]:
         """
@@ -141,7 +388,7 @@ class MCPRestIntegration:
             Lista de marcas
 
         """
-        return self._call_rest_api(BrandApi, error_context="marcas")
+        return self._call_cached_rest_api("rest:get_brands", BrandApi, error_context="marcas")
 
     def get_colors_via_rest(self) -> dict[str, Any]:
         """
@@ -151,7 +398,7 @@ class MCPRestIntegration:
             Lista de cores
 
         """
-        return self._call_rest_api(ColorApi, error_context="cores")
+        return self._call_cached_rest_api("rest:get_colors", ColorApi, error_context="cores")
 
     def get_engines_via_rest(self) -> dict[str, Any]:
         """
@@ -161,7 +408,7 @@ class MCPRestIntegration:
             Lista de motores
 
         """
-        return self._call_rest_api(EngineApi, error_context="motores")
+        return self._call_cached_rest_api("rest:get_engines", EngineApi, error_context="motores")
 
     def get_car_models_via_rest(self) -> dict[str, Any]:
         """
@@ -171,7 +418,7 @@ class MCPRestIntegration:
             Lista de modelos
 
         """
-        return self._call_rest_api(CarModelApi, error_context="modelos")
+        return self._call_cached_rest_api("rest:get_car_models", CarModelApi, error_context="modelos")
 
     def get_car_names_via_rest(self) -> dict[str, Any]:
         """
@@ -181,15 +428,15 @@ class MCPRestIntegration:
             Lista de nomes de carros
 
         """
-        return self._call_rest_api(CarNameApi, error_context="nomes de carros")
+        return self._call_cached_rest_api("rest:get_car_names", CarNameApi, error_context="nomes de carros")
 
-    def _build_query_params(self, filters: CarFilterSerializer, pagination: PaginationSerializer) -> dict[str, Any]:
+    def _build_query_params(self, filters_data: dict[str, Any], pagination_data: dict[str, Any]) -> dict[str, Any]:
         """
         Constrói parâmetros de query para a API REST baseado nos filtros MCP.
 
         Args:
-            filters: Filtros MCP
-            pagination: Paginação MCP
+            filters_data: validated_data do CarFilterSerializer
+            pagination_data: validated_data do PaginationSerializer
 
         Returns:
             Parâmetros de query para a API REST
@@ -197,71 +444,20 @@ class MCPRestIntegration:
         """
         query_params = {}
 
-        # Mapeamento de filtros de relacionamento
-        relationship_filters = {
-            "brand_id": ("car_name__brand_id", str),
-            "brand_name": ("car_name__brand__name__icontains", str),
-            "color_id": ("color_id", str),
-            "color_name": ("color__name__icontains", str),
-            "engine_id": ("engine_id", str),
-            "engine_name": ("engine__name__icontains", str),
-            "car_model_id": ("car_model_id", str),
-            "car_model_name": ("car_model__name__icontains", str),
-            "car_name_id": ("car_name_id", str),
-            "car_name": ("car_name__name__icontains", str),
-        }
-
-        # Mapeamento de filtros de escolha
-        choice_filters = {
-            "fuel_type": "fuel_type",
-            "transmission": "transmission",
-        }
-
-        # Mapeamento de filtros de range (min/max)
-        range_filters = {
-            "year_manufacture": "year_manufacture",
-            "year_model": "year_model",
-            "mileage": "mileage",
-            "doors": "doors",
-            "price": "price",
-        }
-
-        # Mapeamento de parâmetros de paginação
-        pagination_params = {
-            "page": "page",
-            "page_size": "page_size",
-            "ordering": "ordering",
-        }
-
-        # Aplicar filtros de relacionamento
-        for filter_attr, (query_key, transform_func) in relationship_filters.items():
-            value = getattr(filters, filter_attr, None)
-            if value:
-                query_params[query_key] = transform_func(value)
-
-        # Aplicar filtros de escolha
-        for filter_attr, query_key in choice_filters.items():
-            value = getattr(filters, filter_attr, None)
-            if value:
-                query_params[query_key] = value
-
-        # Aplicar filtros de range (min/max)
-        for field_name, db_field in range_filters.items():
-            min_value = getattr(filters, f"{field_name}_min", None)
-            max_value = getattr(filters, f"{field_name}_max", None)
-
-            if min_value is not None:
-                query_params[f"{db_field}__gte"] = min_value
-            if max_value is not None:
-                query_params[f"{db_field}__lte"] = max_value
-
-        # Aplicar busca textual
-        if filters.search:
-            query_params["search"] = filters.search
+        # Aplicar filtros (relacionamento, escolha, range e busca textual) percorrendo apenas os campos enviados;
+        # ranges aceitam 0, os demais filtros ignoram valores vazios
+        for field, value in filters_data.items():
+            spec = _FILTER_QUERY_INDEX.get(field)
+            if spec is None:
+                continue
+            query_key, transform_func, keep_falsy = spec
+            if (value is None) if keep_falsy else (not value):
+                continue
+            query_params[query_key] = transform_func(value) if transform_func else value
 
         # Aplicar parâmetros de paginação
-        for pagination_attr, query_key in pagination_params.items():
-            value = getattr(pagination, pagination_attr, None)
+        for pagination_attr, query_key in _PAGINATION_QUERY_PARAMS:
+            value = pagination_data.get(pagination_attr)
             if value:
                 query_params[query_key] = value
 
@@ -284,25 +480,16 @@ class MCPRestIntegration:
                 return False, "Campo 'action' é obrigatório"
 
             # Validar ação suportada
-            supported_actions = [
-                "search_cars",
-                "get_brands",
-                "get_colors",
-                "get_engines",
-                "get_car_details",
-                "get_filters_options",
-            ]
-
-            if request_data["action"] not in supported_actions:
-                return False, f"Ação '{request_data['action']}' não suportada"
-
-            # Validações específicas por ação
-            if request_data["action"] == "search_cars":
-                return self._validate_search_cars_request(request_data)
-            elif request_data["action"] == "get_car_details":
-                return self._validate_get_car_details_request(request_data)
+            action = request_data["action"]
+            if not isinstance(action, str) or action not in _SUPPORTED_ACTIONS:
+                return False, f"Ação '{action}' não suportada"
 
-            return True, None
+            # Validações específicas por ação (tabela da classe, montada uma única vez)
+            validator_name = self._VALIDATORS.get(action)
+            if validator_name is None:
+                return True, None
+
+            return getattr(self, validator_name)(request_data)
 
         except Exception as e:
             logger.error(f"Erro na validação MCP: {e}", exc_info=True)
@@ -332,8 +519,10 @@ class MCPRestIntegration:
             if "car_id" not in request_data:
                 return False, "Campo 'car_id' é obrigatório"
 
-            # Validar se é um UUID válido
-            UUID(request_data["car_id"])
+            # Validar se é um UUID válido (forma canônica sem construir o objeto UUID)
+            car_id = request_data["car_id"]
+            if not (isinstance(car_id, str) and _UUID_RE.fullmatch(car_id)):
+                UUID(car_id)
 
             return True, None
 
@@ -5,10 +5,30 @@ Este módulo define os serializers utilizados para comunicação MCP via WebSock
 usando apenas padrões do Django REST Framework.
 """
 
+import time
 from datetime import datetime
+from uuid import uuid4
 
 from rest_framework import serializers
 
+# Timestamp ISO reaproveitado dentro da mesma janela de 1 ms (várias respostas por requisição/rajada)
+_TIMESTAMP_TTL = 0.001
+_timestamp_cache = {"iso": "", "expires": 0.0}
+
+
+def now_iso() -> str:
+    """Retorna datetime.now().isoformat(), recalculado no máximo uma vez por milissegundo."""
+    now = time.monotonic()
+    if now >= _timestamp_cache["expires"]:
+        _timestamp_cache["iso"] = datetime.now().isoformat()
+        _timestamp_cache["expires"] = now + _TIMESTAMP_TTL
+    return _timestamp_cache["iso"]
+
+
+def new_request_id() -> str:
+    """Gera um request_id para requisições MCP que não trazem um (único entre workers e reinícios)."""
+    return f"req_{uuid4().hex}"
+
 
 class MCPRequestSerializer(serializers.Serializer):
     """Serializer para requisições MCP."""
@@ -23,9 +43,9 @@ class MCPRequestSerializer(serializers.Serializer):
         if "data" in data and isinstance(data["data"], dict):
             nested_data = data["data"]
 
-            # Extrair campos do nível 'data' se existirem
+            # Extrair campos do nível 'data' se existirem (_declared_fields: mapa da classe, sem os campos vinculados)
             for key, value in nested_data.items():
-                if key in self.fields:
+                if key in self._declared_fields:
                     data[key] = value
 
         return super().validate(data)
@@ -38,7 +58,7 @@ class MCPResponseSerializer(serializers.Serializer):
     request_id = serializers.CharField(required=False, allow_null=True)
     data = serializers.DictField(required=False, allow_null=True, default=dict)
     error = serializers.CharField(required=False, allow_null=True)
-    timestamp = serializers.CharField(default=datetime.now().isoformat)
+    timestamp = serializers.CharField(default=now_iso)
 
 
 class MCPErrorResponseSerializer(MCPResponseSerializer):
@@ -53,15 +73,15 @@ class CarFilterSerializer(serializers.Serializer):
 
     # Filtros de ID
     brand_id = serializers.UUIDField(required=False, allow_null=True)
-    brand_name = serializers.CharField(required=False, allow_null=True)
+    brand_name = serializers.CharField(max_length=255, required=False, allow_null=True)
     color_id = serializers.UUIDField(required=False, allow_null=True)
-    color_name = serializers.CharField(required=False, allow_null=True)
+    color_name = serializers.CharField(max_length=255, required=False, allow_null=True)
     engine_id = serializers.UUIDField(required=False, allow_null=True)
-    engine_name = serializers.CharField(required=False, allow_null=True)
+    engine_name = serializers.CharField(max_length=255, required=False, allow_null=True)
     car_model_id = serializers.UUIDField(required=False, allow_null=True)
-    car_model_name = serializers.CharField(required=False, allow_null=True)
+    car_model_name = serializers.CharField(max_length=255, required=False, allow_null=True)
     car_name_id = serializers.UUIDField(required=False, allow_null=True)
-    car_name = serializers.CharField(required=False, allow_null=True)
+    car_name = serializers.CharField(max_length=255, required=False, allow_null=True)
 
     # Filtros numéricos
     year_manufacture_min = serializers.IntegerField(required=False, allow_null=True, min_value=1900, max_value=9999)
@@ -91,43 +111,12 @@ class PaginationSerializer(serializers.Serializer):
     ordering = serializers.CharField(required=False, allow_null=True)
 
 
-class SearchCarsRequestSerializer(serializers.Serializer):
-    """Serializer para requisição de busca de carros."""
+class SearchCarsRequestSerializer(CarFilterSerializer):
+    """Serializer para requisição de busca de carros (campos de filtro herdados do CarFilterSerializer)."""
 
     action = serializers.CharField(default="search_cars")
     request_id = serializers.CharField(required=False, allow_null=True)
 
-    # Campos de filtros (diretos)
-    brand_id = serializers.UUIDField(required=False, allow_null=True)
-    brand_name = serializers.CharField(max_length=255, required=False, allow_null=True)
-    color_id = serializers.UUIDField(required=False, allow_null=True)
-    color_name = serializers.CharField(max_length=255, required=False, allow_null=True)
-    engine_id = serializers.UUIDField(required=False, allow_null=True)
-    engine_name = serializers.CharField(max_length=255, required=False, allow_null=True)
-    car_model_id = serializers.UUIDField(required=False, allow_null=True)
-    car_model_name = serializers.CharField(max_length=255, required=False, allow_null=True)
-    car_name_id = serializers.UUIDField(required=False, allow_null=True)
-    car_name = serializers.CharField(max_length=255, required=False, allow_null=True)
-
-    # Filtros numéricos
-    year_manufacture_min = serializers.IntegerField(required=False, allow_null=True, min_value=1900, max_value=9999)
-    year_manufacture_max = serializers.IntegerField(required=False, allow_null=True, min_value=1900, max_value=9999)
-    year_model_min = serializers.IntegerField(required=False, allow_null=True, min_value=1900, max_value=9999)
-    year_model_max = serializers.IntegerField(required=False, allow_null=True, min_value=1900, max_value=9999)
-    price_min = serializers.DecimalField(required=False, allow_null=True, max_digits=10, decimal_places=2)
-    price_max = serializers.DecimalField(required=False, allow_null=True, max_digits=10, decimal_places=2)
-    mileage_min = serializers.IntegerField(required=False, allow_null=True, min_value=0)
-    mileage_max = serializers.IntegerField(required=False, allow_null=True, min_value=0)
-    doors_min = serializers.IntegerField(required=False, allow_null=True, min_value=2, max_value=8)
-    doors_max = serializers.IntegerField(required=False, allow_null=True, min_value=2, max_value=8)
-
-    # Filtros de string
-    fuel_type = serializers.CharField(required=False, allow_null=True)
-    transmission = serializers.CharField(required=False, allow_null=True)
-
-    # Busca textual
-    search = serializers.CharField(required=False, allow_null=True)
-
     # Campos de paginação (diretos)
     page = serializers.IntegerField(required=False, min_value=1)
     page_size = serializers.IntegerField(required=False, min_value=1, max_value=100)
@@ -146,19 +135,19 @@ class SearchCarsRequestSerializer(serializers.Serializer):
         if "filters" in nested_data and isinstance(nested_data["filters"], dict):
             filters = nested_data["filters"]
             for key, value in filters.items():
-                if key in self.fields:
+                if key in self._declared_fields:
                     data[key] = value
 
         # Se há pagination aninhada, extrair para o nível principal
         if "pagination" in nested_data and isinstance(nested_data["pagination"], dict):
             pagination = nested_data["pagination"]
             for key, value in pagination.items():
-                if key in self.fields:
+                if key in self._declared_fields:
                     data[key] = value
 
         # Extrair outros campos do nível 'data' se existirem
         for key, value in nested_data.items():
-            if key in self.fields and key not in ["filters", "pagination"]:
+            if key in self._declared_fields and key not in ("filters", "pagination"):
                 data[key] = value
 
         # Aplicar valores padrão se não foram fornecidos
@@ -3,3 +3,387 @@ Tests for WebSocket functionality.
 
 This module contains test cases for WebSocket consumers and related functionality.
 """
+
+import asyncio
+
+import msgpack
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, override_settings
+from model_bakery import baker
+
+from apps.cars.models import Car
+from apps.web_sockets.mcp_consumer import MCPCarSocket
+from apps.web_sockets.mcp_handlers import CarMCPHandler, fast_validate_request
+from apps.web_sockets.mcp_rest_integration import MCPRestIntegration
+from apps.web_sockets.serializers import MCPRequestSerializer
+from apps.web_sockets.views_sockets import dumps_frame, loads_frame, splice_frame
+
+IN_MEMORY_CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+class TestMCPBatchExecute(TestCase):
+    """Test batch_execute with valid and invalid sub-requests in the same batch."""
+
+    def setUp(self):
+        """Create the MCP handler under test."""
+        self.handler = CarMCPHandler()
+
+    async def execute(self, requests, request_id="batch", **data):
+        """Run a batch_execute request and return the MCP response."""
+        return await self.handler.handle_request(
+            {"request_id": request_id, "data": {"action": "batch_execute", "requests": requests, **data}}
+        )
+
+    async def test_mixed_success_and_error_items(self):
+        """Each item gets its own result, in order, and failures do not abort the batch."""
+        response = await self.execute(
+            [
+                {"action": "search_cars"},
+                {"action": "get_car_details", "data": {}},
+                {"action": "unknown_action"},
+                "not a request",
+                {"action": "batch_execute", "requests": []},
+            ]
+        )
+
+        self.assertTrue(response["success"])
+        results = response["data"]["results"]
+        self.assertEqual([result["request_id"] for result in results], [f"batch:{index}" for index in range(5)])
+        self.assertEqual([result["success"] for result in results], [True, False, False, False, False])
+        self.assertEqual(
+            [result.get("error_code") for result in results[1:]],
+            ["MISSING_CAR_ID", "UNSUPPORTED_ACTION", "INVALID_BATCH_ITEM", "INVALID_BATCH_ITEM"],
+        )
+        self.assertEqual(results[0]["data"]["total"], 0)
+
+    async def test_stop_on_error(self):
+        """With stop_on_error the batch stops at the first failing item."""
+        response = await self.execute(
+            [{"action": "search_cars"}, {"action": "unknown_action"}, {"action": "search_cars"}], stop_on_error=True
+        )
+
+        self.assertEqual([result["success"] for result in response["data"]["results"]], [True, False])
+
+    async def test_missing_request_id_generates_one(self):
+        """Without request_id the sub-request ids use a generated id instead of "None"."""
+        response = await self.execute([{"action": "search_cars"}, {"action": "search_cars"}], request_id=None)
+
+        request_id = response["request_id"]
+        self.assertTrue(request_id.startswith("req_"))
+        self.assertEqual(
+            [result["request_id"] for result in response["data"]["results"]], [f"{request_id}:0", f"{request_id}:1"]
+        )
+
+    async def test_inner_request_ids_are_ignored(self):
+        """A request_id inside an item never replaces the generated "<id>:<index>"."""
+        response = await self.execute(
+            [
+                {"action": "search_cars", "request_id": "inner"},
+                {"action": "get_car_details", "request_id": "inner", "data": {}},
+            ]
+        )
+
+        self.assertEqual([result["request_id"] for result in response["data"]["results"]], ["batch:0", "batch:1"])
+
+    async def test_batch_size_limit(self):
+        """Batches above batch_max_requests are rejected as a whole."""
+        response = await self.execute([{"action": "search_cars"}] * (self.handler.batch_max_requests + 1))
+
+        self.assertFalse(response["success"])
+        self.assertEqual(response["error_code"], "BATCH_TOO_LARGE")
+
+    async def test_empty_batch(self):
+        """An empty request list is rejected."""
+        response = await self.execute([])
+
+        self.assertFalse(response["success"])
+        self.assertEqual(response["error_code"], "INVALID_BATCH")
+
+
+class TestFastValidateRequest(SimpleTestCase):
+    """Test that fast_validate_request matches MCPRequestSerializer or defers to it."""
+
+    accepted = (
+        {"request_id": "r1", "data": {"action": "get_brands"}},
+        {"request_id": None, "data": {"action": "get_car_details", "data": {"car_id": "abc"}}},
+        {"data": {"action": "batch_execute", "requests": [{"action": "get_colors"}], "stop_on_error": True}},
+        {"request_id": "r1", "data": {"action": "get_brands", "request_id": "inner"}},
+        {"action": "get_brands", "request_id": "r2"},
+    )
+    deferred = (
+        {"request_id": " r1 ", "data": {"action": "get_brands"}},
+        {"request_id": "", "data": {"action": "get_brands"}},
+        {"request_id": 5, "data": {"action": "get_brands"}},
+        {"type": "mcp_request", "request_id": "r1", "data": {}},
+        {"request_id": "r1", "data": [1]},
+        {"action": "x" * 101},
+    )
+
+    def test_accepted_requests_match_serializer(self):
+        """Whenever the fast path accepts a request, the result equals the serializer's validated_data."""
+        for request_data in self.accepted:
+            with self.subTest(request_data=request_data):
+                serializer = MCPRequestSerializer(data=request_data)
+                self.assertTrue(serializer.is_valid())
+                self.assertEqual(fast_validate_request(request_data), dict(serializer.validated_data))
+
+    def test_other_requests_defer_to_serializer(self):
+        """Requests the serializer would reject or normalize are left to it."""
+        for request_data in self.deferred:
+            with self.subTest(request_data=request_data):
+                self.assertIsNone(fast_validate_request(request_data))
+
+
+class TestSpliceFrame(SimpleTestCase):
+    """Test splice_frame against a regular serialization of the whole frame."""
+
+    def test_splice_matches_full_serialization(self):
+        """The spliced frame decodes to the envelope plus the decoded data."""
+        raw_data = dumps_frame({"message": "olá", "items": [1, 2.5, None]})
+        envelope = {"type": "broadcast", "room": "general"}
+
+        spliced = splice_frame(envelope, raw_data)
+
+        self.assertEqual(loads_frame(spliced), {**envelope, "data": loads_frame(raw_data)})
+
+    def test_splice_empty_envelope(self):
+        """An empty envelope produces a frame with only the data key."""
+        self.assertEqual(loads_frame(splice_frame({}, "[1,2]")), {"data": [1, 2]})
+
+
+class TestCreateGetRequest(SimpleTestCase):
+    """Test the internal GET requests handed to the REST views."""
+
+    def test_query_string_matches_query_params(self):
+        """Filters show up in query_params and in the absolute URI used for pagination links."""
+        integration = MCPRestIntegration()
+        request = integration.create_get_request({"brand_name": "Fiat", "fuel_type": ["flex", "gasoline"], "page": 2})
+
+        self.assertEqual(request.query_params.getlist("fuel_type"), ["flex", "gasoline"])
+        self.assertEqual(request.query_params["page"], "2")
+        self.assertTrue(
+            request.build_absolute_uri().endswith("?brand_name=Fiat&fuel_type=flex&fuel_type=gasoline&page=2")
+        )
+
+    def test_prototype_request_is_not_modified(self):
+        """Each request gets its own META, so query strings do not leak between calls."""
+        integration = MCPRestIntegration()
+        integration.create_get_request({"page": 2})
+
+        self.assertEqual(integration.create_get_request().build_absolute_uri(), "http://testserver/")
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestMCPSubprotocolFraming(TestCase):
+    """Test the frame formats negotiated through the WebSocket subprotocol."""
+
+    # Long unknown action: the error echoes it, so the response exceeds binary_frame_threshold
+    large_request = {"type": "mcp_request", "request_id": "big", "data": {"action": "x" * 5000}}
+
+    async def connect(self, subprotocols):
+        """Connect to the MCP consumer and consume the welcome frame."""
+        communicator = WebsocketCommunicator(MCPCarSocket.as_asgi(), "/mcp/cars/", subprotocols=subprotocols)
+        connected, protocol = await communicator.connect()
+        self.assertTrue(connected)
+        welcome = await communicator.receive_output()
+        return communicator, protocol, welcome
+
+    async def test_plain_v1_sends_text_frames(self):
+        """MCP-V1 clients always get text frames, even for large responses."""
+        communicator, protocol, welcome = await self.connect(["MCP-V1"])
+        self.assertEqual(protocol, "MCP-V1")
+        self.assertEqual(loads_frame(welcome["text"])["type"], "mcp_welcome")
+
+        await communicator.send_json_to(self.large_request)
+        output = await communicator.receive_output()
+
+        self.assertIsNone(output.get("bytes"))
+        self.assertEqual(loads_frame(output["text"])["error_code"], "UNSUPPORTED_ACTION")
+        await communicator.disconnect()
+
+    async def test_no_subprotocol_defaults_to_plain_v1(self):
+        """Clients that offer no known subprotocol get MCP-V1."""
+        communicator, protocol, welcome = await self.connect(["unknown"])
+
+        self.assertEqual(protocol, "MCP-V1")
+        self.assertIn("text", welcome)
+        await communicator.disconnect()
+
+    async def test_binary_sends_large_frames_as_bytes(self):
+        """MCP-V1-binary clients get large responses as UTF-8 JSON in binary frames."""
+        communicator, protocol, welcome = await self.connect(["MCP-V1-binary"])
+        self.assertEqual(protocol, "MCP-V1-binary")
+        self.assertIn("text", welcome)
+
+        await communicator.send_json_to(self.large_request)
+        output = await communicator.receive_output()
+
+        self.assertEqual(loads_frame(output["bytes"])["request_id"], "big")
+        await communicator.disconnect()
+
+    async def test_msgpack_frames(self):
+        """MCP-V2-msgpack clients exchange MessagePack binary frames."""
+        communicator, protocol, welcome = await self.connect(["MCP-V2-msgpack"])
+        self.assertEqual(protocol, "MCP-V2-msgpack")
+        self.assertEqual(msgpack.unpackb(welcome["bytes"])["type"], "mcp_welcome")
+
+        request = {"type": "mcp_request", "request_id": "m1", "data": {"action": "unknown_action"}}
+        await communicator.send_to(bytes_data=msgpack.packb(request))
+        response = msgpack.unpackb((await communicator.receive_output())["bytes"])
+
+        self.assertEqual((response["request_id"], response["error_code"]), ("m1", "UNSUPPORTED_ACTION"))
+        await communicator.disconnect()
+
+    async def test_msgpack_non_map_message(self):
+        """MessagePack values that are not maps are rejected as INVALID_MSGPACK."""
+        communicator, _, _ = await self.connect(["MCP-V2-msgpack"])
+
+        await communicator.send_to(bytes_data=msgpack.packb([1, 2, 3]))
+        response = msgpack.unpackb((await communicator.receive_output())["bytes"])
+
+        self.assertEqual(response["error_code"], "INVALID_MSGPACK")
+        await communicator.disconnect()
+
+    async def test_binary_frame_without_msgpack(self):
+        """Binary frames from clients that did not negotiate MessagePack get an error reply."""
+        communicator, _, _ = await self.connect(["MCP-V1"])
+
+        await communicator.send_to(bytes_data=b"\x93\x01\x02\x03")
+        response = await communicator.receive_json_from()
+
+        self.assertEqual(response["error_code"], "UNSUPPORTED_FRAME")
+        await communicator.disconnect()
+
+    async def test_client_preference_order(self):
+        """The first supported subprotocol offered by the client is accepted."""
+        communicator, protocol, _ = await self.connect(["unknown", "MCP-V1-batch", "MCP-V1-binary"])
+
+        self.assertEqual(protocol, "MCP-V1-batch")
+        await communicator.disconnect()
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestMCPSearchStreaming(TestCase):
+    """Test search_cars with "stream": true over the MCP consumer."""
+
+    def setUp(self):
+        """Create more cars than one streamed chunk holds."""
+        baker.make(Car, _quantity=CarMCPHandler.search_chunk_size + 5)
+
+    async def test_stream_sends_chunks_then_end(self):
+        """Results arrive in search_chunk_size chunks followed by mcp_search_end with the totals."""
+        communicator = WebsocketCommunicator(MCPCarSocket.as_asgi(), "/mcp/cars/", subprotocols=["MCP-V1"])
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to(
+            {
+                "type": "mcp_request",
+                "request_id": "s1",
+                "data": {"action": "search_cars", "stream": True, "pagination": {"page_size": 50}},
+            }
+        )
+        frames = [await communicator.receive_json_from() for _ in range(3)]
+
+        self.assertEqual(
+            [frame["type"] for frame in frames], ["mcp_search_chunk", "mcp_search_chunk", "mcp_search_end"]
+        )
+        self.assertEqual({frame["request_id"] for frame in frames}, {"s1"})
+        self.assertEqual([len(frame["chunk"]) for frame in frames[:2]], [CarMCPHandler.search_chunk_size, 5])
+        self.assertIn("updated_at", frames[0]["chunk"][0])
+        self.assertEqual((frames[2]["total"], frames[2]["total_pages"]), (CarMCPHandler.search_chunk_size + 5, 1))
+        await communicator.disconnect()
+
+    async def test_stream_keeps_order_with_batching(self):
+        """With a *-batch subprotocol the streamed frames share the queue and keep their order."""
+        communicator = WebsocketCommunicator(MCPCarSocket.as_asgi(), "/mcp/cars/", subprotocols=["MCP-V1-batch"])
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        for request_id in ("s1", "s2"):
+            await communicator.send_json_to(
+                {"type": "mcp_request", "request_id": request_id, "data": {"action": "search_cars", "stream": True}}
+            )
+        frames = []
+        while len([frame for frame in frames if frame["type"] == "mcp_search_end"]) < 2:
+            frame = await communicator.receive_json_from()
+            frames.extend(frame["items"] if frame["type"] == "mcp_batch" else [frame])
+
+        self.assertEqual(
+            [(frame["type"], frame["request_id"]) for frame in frames],
+            [
+                ("mcp_search_chunk", "s1"),
+                ("mcp_search_end", "s1"),
+                ("mcp_search_chunk", "s2"),
+                ("mcp_search_end", "s2"),
+            ],
+        )
+        await communicator.disconnect()
+
+
+class TestMCPBatchFlusher(SimpleTestCase):
+    """Test the mcp_batch coalescing used by the *-batch subprotocols."""
+
+    def setUp(self):
+        """Create a consumer whose sends are recorded instead of written to a socket."""
+        self.socket = MCPCarSocket()
+        self.socket.use_batching = True
+        self.sent = []
+
+        async def send(text_data=None, bytes_data=None, close=False):
+            frame = loads_frame(text_data if text_data is not None else bytes_data)
+            if self.fail_all or (frame.get("type") == "mcp_batch" and self.fail_batches):
+                raise RuntimeError("send failed")
+            self.sent.append(frame)
+
+        self.fail_batches = False
+        self.fail_all = False
+        self.socket.send = send
+
+    async def flush(self, *frames):
+        """Queue frames in the same tick and let the flusher send them."""
+        self.socket._flusher = asyncio.create_task(self.socket._flush_loop())
+        for frame in frames:
+            await self.socket.send_json(frame)
+        while not self.socket._out_queue.empty():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.socket._flusher.cancel()
+
+    async def test_frames_in_same_tick_are_batched(self):
+        """Frames queued together go out as one mcp_batch, in order."""
+        await self.flush({"type": "mcp_response", "request_id": "a"}, {"type": "mcp_response", "request_id": "b"})
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.sent[0]["type"], "mcp_batch")
+        self.assertEqual([item["request_id"] for item in self.sent[0]["items"]], ["a", "b"])
+
+    async def test_single_frame_is_not_wrapped(self):
+        """A lone frame is sent as is."""
+        await self.flush({"type": "mcp_response", "request_id": "a"})
+
+        self.assertEqual(self.sent, [{"type": "mcp_response", "request_id": "a"}])
+
+    async def test_failed_batch_reports_errors(self):
+        """When a batch cannot be sent, each request in it gets a SEND_ERROR."""
+        self.fail_batches = True
+
+        await self.flush({"type": "mcp_response", "request_id": "a"}, {"type": "mcp_response", "request_id": "b"})
+
+        self.assertEqual(
+            [(frame["request_id"], frame["error_code"]) for frame in self.sent],
+            [("a", "SEND_ERROR"), ("b", "SEND_ERROR")],
+        )
+
+    async def test_flusher_stops_when_error_reply_fails(self):
+        """If even the SEND_ERROR reply fails, the flusher exits, drops the queue and later sends go direct."""
+        self.fail_all = True
+        self.socket._out_queue = asyncio.Queue(maxsize=1)
+        self.socket._flusher = asyncio.create_task(self.socket._flush_loop())
+
+        await self.socket.send_json({"type": "mcp_response", "request_id": "a"})
+        await asyncio.wait_for(self.socket._flusher, timeout=1)
+
+        self.assertTrue(self.socket._out_queue.empty())
+        with self.assertRaises(RuntimeError):
+            await asyncio.wait_for(self.socket.send_json({"type": "mcp_response", "request_id": "b"}), timeout=1)
@@ -9,6 +9,7 @@ identification.
 import json
 import logging
 from datetime import datetime
+from typing import Any
 
 import channels
 import channels.layers
@@ -18,9 +19,45 @@ from rest_framework.permissions import AllowAny
 
 from drf_base_apps.utils import get_user_model
 
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele, usa o json da biblioteca padrão
+    orjson = None
+
 User = get_user_model()
 
 
+def dumps_frame_bytes(data: Any) -> bytes:
+    """Serializa um frame WebSocket em bytes UTF-8, usando orjson quando disponível."""
+    if orjson is not None:
+        try:
+            # datetime/UUID/dataclass têm caminho nativo no orjson; default=str só cobre o resto (Decimal, textos lazy)
+            return orjson.dumps(data, default=str)
+        except orjson.JSONEncodeError:
+            # Chaves não-str (aceitas pelo json): a opção é mais lenta, então só entra quando necessária
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=str).encode("utf-8")
+
+
+def dumps_frame(data: Any) -> str:
+    """Serializa um frame WebSocket em texto, usando orjson quando disponível."""
+    return dumps_frame_bytes(data).decode("utf-8")
+
+
+def loads_frame(data: str | bytes) -> Any:
+    """Decodifica um frame WebSocket, usando orjson quando disponível (erros são sempre json.JSONDecodeError)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def splice_frame(envelope: dict, raw_data: str) -> str:
+    """Monta o frame em texto encaixando o JSON já serializado de "data", sem decodificá-lo nem serializá-lo de novo."""
+    serialized = dumps_frame(envelope)
+    separator = "," if envelope else ""
+    return f'{serialized[:-1]}{separator}"data":{raw_data}}}'
+
+
 class SocketsLayout:
     """Layout base para envio de mensagens via WebSocket."""
 
@@ -28,14 +65,22 @@ class SocketsLayout:
 
     def get_layout(self, channel, data, channel_type="array"):
         """Get the layout for WebSocket message sending."""
-        try:
-            data = json.loads(data)
-        except (TypeError, KeyError, ValueError) as e:
-            logging.debug(e)
+        # "data" viaja pelo channel layer como JSON serializado uma única vez: JSON recebido pronto segue como
+        # está (só é validado), o resto é serializado aqui; os destinatários o encaixam no frame sem reprocessar
+        if isinstance(data, (str, bytes, bytearray)):
+            try:
+                loads_frame(data)
+            except ValueError as e:
+                logging.debug(e)
+                data = dumps_frame(data if isinstance(data, str) else data.decode("utf-8", "replace"))
+            else:
+                data = data if isinstance(data, str) else data.decode("utf-8")
+        else:
+            data = dumps_frame(data)
         return {
             "type": self.type,
             "channel": channel,
-            "data": json.dumps(data, default=str),
+            "data": data,
             "channel_type": channel_type,
         }
 
@@ -129,7 +174,7 @@ class AbstractSocket(SocketsLayout, AsyncWebsocketConsumer):
 
                 # Parse da mensagem JSON se possível
                 try:
-                    message_data = json.loads(text_data)
+                    message_data = loads_frame(text_data)
                     message_type = message_data.get("type", "message")
                     message_content = message_data.get("data", text_data)
                 except json.JSONDecodeError:
@@ -146,7 +191,7 @@ class AbstractSocket(SocketsLayout, AsyncWebsocketConsumer):
                     "timestamp": str(datetime.now()),
                 }
 
-                await self.send(text_data=json.dumps(response, default=str))
+                await self.send(text_data=dumps_frame(response))
 
                 # Se for uma mensagem de broadcast, enviar para toda a sala
                 if message_type == "broadcast":
@@ -154,15 +199,18 @@ class AbstractSocket(SocketsLayout, AsyncWebsocketConsumer):
 
         except Exception as e:
             logging.error(f"Erro ao processar mensagem: {e}")
-            await self.send(text_data=json.dumps({"type": "error", "message": f"Erro ao processar mensagem: {e!s}"}))
+            await self.send(text_data=dumps_frame({"type": "error", "message": f"Erro ao processar mensagem: {e!s}"}))
 
     async def send_messages(self, dt: dict):
         """Envia mensagens para o cliente."""
         data = dt.copy()
-        if "data" in data and isinstance(data["data"], str):
-            data["data"] = json.loads(data["data"])
         data.pop("type", None)
-        await self.send(text_data=json.dumps(data, default=str))
+        if isinstance(data.get("data"), str):
+            # JSON já serializado pelo remetente (get_layout): encaixado no frame como está
+            raw_data = data.pop("data")
+            await self.send(text_data=splice_frame(data, raw_data))
+            return
+        await self.send(text_data=dumps_frame(data))
 
     async def broadcast_to_room(self, message):
         """Envia uma mensagem para todos os usuários na sala."""
@@ -175,7 +223,7 @@ class AbstractSocket(SocketsLayout, AsyncWebsocketConsumer):
         }
 
         await self.channel_layer.group_send(
-            self.room, {"type": "group_message", "data": json.dumps(broadcast_message, default=str)}
+            self.room, {"type": "group_message", "data": dumps_frame(broadcast_message)}
         )
 
     async def group_message(self, event):
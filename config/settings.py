@@ -24,8 +24,9 @@ extend_settings(settings_path)
 # Import base settings - this will populate the global namespace
 from drf_base_config.settings import *
 
-# Add project-specific apps to INSTALLED_APPS
-INSTALLED_APPS += ["apps.cars", "apps.terminal_agent"]
+# Add project-specific apps to INSTALLED_APPS. PROJECT_INSTALLED_APPS (apps.web_sockets) is installed as is;
+# drf_base_user.schemas also reads that list to scope user permissions, so it is extended here, not edited
+INSTALLED_APPS += [*PROJECT_INSTALLED_APPS, "apps.cars", "apps.terminal_agent"]
 
 ROOT_URLCONF = "config.urls"
 